@@ -0,0 +1,23 @@
+"""
+Benchmarks for the Proceed Revenue ETL Service
+Synthetic Master_Table generation, timed scenarios and baseline comparison
+
+Run from the directory holding proceed_etl_service.py:
+    python -m benchmarks run --sizes 1000,100000 --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
+
+import os
+import sys
+
+# proceed_etl_service.py is a script next to this package, not an installed module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from .synthetic import generate_master_table, write_master_table
+from .scenarios import (SCENARIOS, DEFAULT_SIZES, run_benchmarks, compare_results,
+                        load_results, save_results)
+
+__all__ = [
+    'generate_master_table', 'write_master_table',
+    'SCENARIOS', 'DEFAULT_SIZES', 'run_benchmarks', 'compare_results', 'load_results', 'save_results'
+]
@@ -0,0 +1,93 @@
+"""
+Command line entry point: python -m benchmarks {run,compare,generate}
+"""
+
+import argparse
+import sys
+
+from .scenarios import (SCENARIOS, DEFAULT_SIZES, EXCEL_MAX_ROWS, run_benchmarks, compare_results,
+                        load_results, save_results)
+from .synthetic import generate_master_table, write_master_table
+
+
+def parse_list(value: str) -> list:
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def print_comparisons(comparisons: list, threshold: float) -> bool:
+    """Print a comparison table; returns whether any result regressed"""
+    print(f"\n{'scenario':<16}{'rows':>10}{'baseline s':>14}{'current s':>14}{'ratio':>8}")
+    for comparison in comparisons:
+        ratio = f"{comparison['ratio']:.2f}" if comparison['ratio'] is not None else '-'
+        flag = '  REGRESSION' if comparison['regression'] else ''
+        print(f"{comparison['scenario']:<16}{comparison['rows']:>10}{comparison['baseline']:>14.4f}"
+              f"{comparison['current']:>14.4f}{ratio:>8}{flag}")
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+    print(f"\n{len(regressions)} of {len(comparisons)} results regressed by more than {threshold:.0%}")
+    return bool(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Proceed Revenue ETL benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Time the scenarios on synthetic tables')
+    run_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help='Comma separated row counts (default: 1k to 1M)')
+    run_parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    run_parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per scenario')
+    run_parser.add_argument('--excel-max-rows', type=int, default=EXCEL_MAX_ROWS,
+                            help='Skip the workbook load scenarios above this size')
+    run_parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic tables')
+    run_parser.add_argument('--output', help='Write the results as JSON to this file')
+    run_parser.add_argument('--baseline', help='Compare against this results file and exit 1 on regressions')
+    run_parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Slowdown fraction counted as a regression (default: 0.25)')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two results files')
+    compare_parser.add_argument('baseline', help='Stored baseline results')
+    compare_parser.add_argument('current', help='Results to check')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='Slowdown fraction counted as a regression (default: 0.25)')
+
+    generate_parser = subparsers.add_parser('generate', help='Write a synthetic Master_Table workbook')
+    generate_parser.add_argument('output', help='Workbook path, e.g. Master_Table_100k.xlsx')
+    generate_parser.add_argument('--rows', type=int, help='Exact row count (derives --customers)')
+    generate_parser.add_argument('--customers', type=int, default=50, help='Number of customers')
+    generate_parser.add_argument('--service-types', type=int, default=2, help='Number of service types')
+    generate_parser.add_argument('--years', default='2023,2024,2025', help='Comma separated years')
+    generate_parser.add_argument('--sparsity', type=float, default=0.2, help='Fraction of empty grid cells')
+    generate_parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        frame = generate_master_table(rows=args.rows, customers=args.customers, service_types=args.service_types,
+                                      years=[int(year) for year in parse_list(args.years)],
+                                      sparsity=args.sparsity, seed=args.seed)
+        write_master_table(frame, args.output)
+        print(f"Wrote {len(frame)} rows to {args.output}")
+        return
+
+    if args.command == 'compare':
+        comparisons = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+        sys.exit(1 if print_comparisons(comparisons, args.threshold) else 0)
+
+    def report(result: dict):
+        print(f"{result['scenario']:<16}{result['rows']:>10}  median {result['median']:.4f} s  "
+              f"min {result['min']:.4f} s")
+
+    results = run_benchmarks([int(size) for size in parse_list(args.sizes)], args.repeat,
+                             parse_list(args.scenarios), args.excel_max_rows, args.seed, progress=report)
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        comparisons = compare_results(load_results(args.baseline), results, args.threshold)
+        sys.exit(1 if print_comparisons(comparisons, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+    main()
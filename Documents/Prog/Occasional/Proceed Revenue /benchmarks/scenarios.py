@@ -0,0 +1,196 @@
+"""
+Timed benchmark scenarios for ProceedETLService
+Results are plain JSON so runs can be stored and compared against a baseline
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from proceed_etl_service import ProceedETLService
+from .synthetic import generate_master_table, write_master_table
+
+# Bump when the layout of the results file changes
+RESULTS_FORMAT_VERSION = 1
+
+SCENARIOS = ['load_excel', 'load_cache', 'load_stream', 'load_frame', 'report_month', 'report_quarter',
+             'report_year', 'slides', 'all_reports']
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Writing and parsing workbooks beyond this many rows takes minutes per size
+EXCEL_MAX_ROWS = 100000
+
+
+def environment_info() -> Dict[str, Any]:
+    """Interpreter, platform and library versions of the benchmark run"""
+    info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+    try:
+        import openpyxl
+        info['openpyxl'] = openpyxl.__version__
+    except ImportError:
+        info['openpyxl'] = None
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['git_commit'] = None
+    return info
+
+
+def time_call(call: Callable[[], Any], repeat: int, setup: Callable[[], Any] = None) -> List[float]:
+    """Wall-clock seconds of repeat calls; setup runs untimed before each one
+
+    The service's console output is swallowed so it does not skew timings.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_benchmarks(sizes: List[int] = None, repeat: int = 3, scenarios: List[str] = None,
+                   excel_max_rows: int = EXCEL_MAX_ROWS, seed: int = 0,
+                   progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """Time each scenario at each table size and return a results document
+
+    Excel scenarios are skipped above excel_max_rows. Report scenarios start
+    from an empty report cache on every repetition, so they measure
+    generation rather than cache hits. progress is called with each result
+    as it is measured.
+    """
+    sizes = sizes or DEFAULT_SIZES
+    scenarios = scenarios or SCENARIOS
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = []
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='proceed-bench-') as workdir:
+        # Slides are written to the working directory
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                frame = generate_master_table(rows=size, seed=seed)
+                year = int(frame['Year'].max())
+
+                etl = ProceedETLService(autoload=False)
+                etl.load_frame(frame)
+
+                timed = {
+                    'load_frame': (lambda: etl.load_frame(frame), None),
+                    'report_month': (lambda: etl.generate_report('month', year, month=6), etl.clear_report_cache),
+                    'report_quarter': (lambda: etl.generate_report('quarter', year, quarter=2),
+                                       etl.clear_report_cache),
+                    'report_year': (lambda: etl.generate_report('year', year), etl.clear_report_cache),
+                    'slides': (lambda: etl.generate_presentation_slides(year, 6, 2), etl.clear_report_cache),
+                    'all_reports': (lambda: etl.generate_all_reports(year), etl.clear_report_cache)
+                }
+
+                excel_file = os.path.join(workdir, f"master_{size}.xlsx")
+                if size <= excel_max_rows and {'load_excel', 'load_cache', 'load_stream'} & set(scenarios):
+                    write_master_table(frame, excel_file)
+                    excel_etl = ProceedETLService(excel_file, use_cache=False, autoload=False)
+                    cached_etl = ProceedETLService(excel_file, autoload=False)
+                    streaming_etl = ProceedETLService(excel_file, autoload=False, streaming=True)
+                    # Write the sidecar once so every timed load is a cache hit
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        cached_etl.load_data()
+                    timed['load_excel'] = (excel_etl.load_data, None)
+                    timed['load_cache'] = (cached_etl.load_data, None)
+                    timed['load_stream'] = (streaming_etl.load_data, None)
+
+                for scenario in scenarios:
+                    if scenario not in timed:
+                        continue
+                    call, setup = timed[scenario]
+                    timings = time_call(call, repeat, setup)
+                    result = {
+                        'scenario': scenario,
+                        'rows': size,
+                        'repeat': repeat,
+                        'seconds': [round(seconds, 6) for seconds in timings],
+                        'min': round(min(timings), 6),
+                        'median': round(statistics.median(timings), 6)
+                    }
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+        finally:
+            os.chdir(previous_dir)
+
+    return {
+        'format': RESULTS_FORMAT_VERSION,
+        'environment': environment_info(),
+        'settings': {'sizes': sizes, 'repeat': repeat, 'seed': seed, 'excel_max_rows': excel_max_rows},
+        'results': results
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.25,
+                    min_delta: float = 0.002) -> List[Dict[str, Any]]:
+    """Median timings of current against baseline for every scenario/size in both
+
+    A result is a regression when its median is more than threshold
+    (a fraction) slower than the baseline and by at least min_delta seconds,
+    so sub-millisecond noise is not flagged.
+    """
+    baseline_medians = {(result['scenario'], result['rows']): result['median'] for result in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        key = (result['scenario'], result['rows'])
+        if key not in baseline_medians:
+            continue
+        before, after = baseline_medians[key], result['median']
+        comparisons.append({
+            'scenario': result['scenario'],
+            'rows': result['rows'],
+            'baseline': before,
+            'current': after,
+            'ratio': round(after / before, 3) if before > 0 else None,
+            'regression': after > before * (1 + threshold) and after - before >= min_delta
+        })
+    return comparisons
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a results file written by save_results"""
+    with open(path) as f:
+        results = json.load(f)
+    if results.get('format') != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark results format in {path}: {results.get('format')}")
+    return results
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Write a results document as indented JSON"""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,78 @@
+"""
+Deterministic synthetic Master_Table generator
+The same arguments always produce the same rows, in the same order
+"""
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from proceed_etl_service import MONTH_NAMES
+
+SERVICE_TYPES = ['Transportation', 'Warehouses']
+
+
+def generate_master_table(rows: Optional[int] = None, customers: int = 50, service_types: int = 2,
+                          years: Sequence[int] = (2023, 2024, 2025), sparsity: float = 0.2,
+                          seed: int = 0) -> pd.DataFrame:
+    """Master_Table-shaped frame with reproducible values
+
+    The grid is customers x service types x years x 12 months and sparsity
+    is the fraction of its cells left out. With rows set, customers is
+    derived from it and exactly that many cells are kept. Like the real
+    workbook, some metric cells are blank, rows are not sorted by period and
+    every customer/service/year stops earning revenue at a random month, so
+    the smart YTD cutoff is exercised.
+    """
+    if not 0 <= sparsity < 1:
+        raise ValueError(f"sparsity must be in [0, 1): {sparsity}")
+    years = list(years)
+    per_customer = service_types * len(years) * 12
+    if rows is not None:
+        customers = max(1, math.ceil(rows / (per_customer * (1 - sparsity))))
+    cells = customers * per_customer
+    size = min(rows, cells) if rows is not None else round(cells * (1 - sparsity))
+
+    rng = np.random.default_rng(seed)
+    chosen = np.sort(rng.choice(cells, size=size, replace=False))
+    customer_idx, service_idx, year_idx, month_idx = np.unravel_index(
+        chosen, (customers, service_types, len(years), 12))
+
+    # Last month (1-12) with revenue for every customer/service/year
+    last_revenue_month = rng.integers(1, 13, size=(customers, service_types, len(years)))
+
+    def amounts(high: float, blank_rate: float) -> np.ndarray:
+        values = np.round(rng.uniform(0, high, size=size), 2)
+        values[rng.random(size) < blank_rate] = np.nan
+        return values
+
+    cost = amounts(80000, 0.02)
+    target = amounts(90000, 0.02)
+    revenue = amounts(100000, 0.1)
+    revenue[month_idx + 1 > last_revenue_month[customer_idx, service_idx, year_idx]] = np.nan
+    receivables = amounts(50000, 0.6)
+
+    customer_names = np.array([f"Customer {number:05d}" for number in range(1, customers + 1)], dtype=object)
+    service_names = np.array([
+        SERVICE_TYPES[number] if number < len(SERVICE_TYPES) else f"Service {number + 1}"
+        for number in range(service_types)
+    ], dtype=object)
+
+    frame = pd.DataFrame({
+        'Customer': customer_names[customer_idx],
+        'Service_Type': service_names[service_idx],
+        'Year': np.asarray(years, dtype=np.int64)[year_idx],
+        'Month': np.array(MONTH_NAMES, dtype=object)[month_idx],
+        'Cost': cost,
+        'Target': target,
+        'Revenue': revenue,
+        'Receivables Collected': receivables
+    })
+    return frame.iloc[rng.permutation(size)].reset_index(drop=True)
+
+
+def write_master_table(frame: pd.DataFrame, path: str):
+    """Write a generated table as a workbook ProceedETLService can load"""
+    frame.to_excel(path, index=False)
@@ -5,34 +5,1666 @@ Creates reports from Master_Table.xlsx for dashboard consumption
 Supports Month-to-Date, Quarter-to-Date, and Year-to-Date calculations
 """
 
+import numpy as np
 import pandas as pd
+import cProfile
+import filecmp
+import gzip
+import hashlib
+import io
 import json
+import os
+import pstats
+import sqlite3
+import stat
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any
+from fnmatch import fnmatch
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 import argparse
+import calendar
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_INDEX = {month: idx for idx, month in enumerate(MONTH_NAMES)}
+METRIC_COLUMNS = ['Cost', 'Target', 'Revenue', 'Receivables Collected']
+
+# The only sheet columns reports need, and the types they are parsed as
+MASTER_COLUMNS = ['Customer', 'Service_Type', 'Year', 'Month'] + METRIC_COLUMNS
+MASTER_DTYPES = {'Customer': str, 'Service_Type': str, 'Month': str, **{column: float for column in METRIC_COLUMNS}}
+
+# Strings read_excel treats as missing by default (its documented na_values); the streaming reader must agree
+STR_NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                           '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+# Error values openpyxl returns for formula cells; read_excel reads them as missing
+EXCEL_ERROR_CODES = frozenset(['#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A'])
+
+# Bump when the sidecar layout changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = '.cache.npz'
+
+# Incremental runs remember per-group fingerprints of the last load here
+ETL_STATE_FILE = '.etl_state.json'
+ETL_STATE_FORMAT_VERSION = 1
+
+# Dashboard database table fed by the SQLite sink (see backend/database/schema.sql)
+REVENUE_TABLE = 'revenue_data'
+
+REVENUE_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer TEXT NOT NULL,
+    service_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    cost REAL DEFAULT 0,
+    target REAL DEFAULT 0,
+    revenue REAL DEFAULT 0,
+    receivables_collected REAL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    days INTEGER DEFAULT 30,
+    original_cost REAL DEFAULT 0,
+    original_target REAL DEFAULT 0,
+    UNIQUE(customer, service_type, year, month)
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_composite ON {table}(customer, service_type, year, month);
+CREATE INDEX IF NOT EXISTS idx_{table}_year_month ON {table}(year, month);
+"""
+
+# Columns the backend migrations (backend/database/persistent-db.js) add to older tables
+REVENUE_MIGRATED_COLUMNS = [
+    ('days', 'INTEGER DEFAULT 30'),
+    ('original_cost', 'REAL DEFAULT 0'),
+    ('original_target', 'REAL DEFAULT 0')
+]
+
+# Same columns as the dashboard upload (backend/services/etl.service.js insertData)
+REVENUE_UPSERT = """
+INSERT INTO {table} (customer, service_type, year, month, cost, target, revenue, receivables_collected, days,
+                     original_cost, original_target, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(customer, service_type, year, month) DO UPDATE SET
+    cost = excluded.cost,
+    target = excluded.target,
+    revenue = excluded.revenue,
+    receivables_collected = excluded.receivables_collected,
+    days = excluded.days,
+    original_cost = excluded.original_cost,
+    original_target = excluded.original_target,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+# Keys of the rows just upserted; with pruning, rows of the loaded years without a key left the workbook
+REVENUE_KEYS_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS revenue_keys (
+    customer TEXT NOT NULL,
+    service_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    PRIMARY KEY (customer, service_type, year, month)
+) WITHOUT ROWID;
+DELETE FROM temp.revenue_keys;
+"""
+
+REVENUE_PRUNE = """
+DELETE FROM {table}
+WHERE {year_filter}NOT EXISTS (
+    SELECT 1 FROM temp.revenue_keys AS k
+    WHERE k.customer = {table}.customer AND k.service_type = {table}.service_type
+      AND k.year = {table}.year AND k.month = {table}.month
+)
+"""
+
+# Materialized MTD/QTD/YTD aggregates kept next to revenue_data; period is the
+# month or quarter number (0 for YTD). etl_summary_state drives incremental refresh.
+SUMMARY_TABLES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS etl_period_summary (
+    period_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    customer TEXT NOT NULL,
+    service_type TEXT NOT NULL,
+    period_name TEXT NOT NULL,
+    cost REAL, target REAL, revenue REAL, receivables_collected REAL,
+    achievement_pct REAL, gross_profit_pct REAL, collection_rate_pct REAL,
+    PRIMARY KEY (period_type, year, period, customer, service_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS etl_service_type_summary (
+    period_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    service_type TEXT NOT NULL,
+    period_name TEXT NOT NULL,
+    cost REAL, target REAL, revenue REAL, receivables_collected REAL,
+    achievement_pct REAL, gross_profit REAL, gross_profit_pct REAL,
+    PRIMARY KEY (period_type, year, period, service_type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS etl_company_summary (
+    period_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    period_name TEXT NOT NULL,
+    cost REAL, target REAL, revenue REAL, receivables_collected REAL,
+    achievement_pct REAL, gross_profit REAL, gross_profit_pct REAL,
+    PRIMARY KEY (period_type, year, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS etl_summary_state (
+    period_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period_type, year, period)
+) WITHOUT ROWID;
+"""
+
+# SQL pushdown engine: covering index so period queries never touch the table rows
+REPORT_ENGINE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_{table}_report ON {table}(
+    year, customer, service_type, month, cost, target, revenue, receivables_collected
+)
+"""
+
+# MTD/QTD totals; month placeholders are filled in per period
+REPORT_RANGE_QUERY = """
+SELECT customer, service_type,
+       TOTAL(cost), TOTAL(target), TOTAL(revenue), TOTAL(receivables_collected)
+FROM {table}
+WHERE year = ? AND month IN ({months})
+GROUP BY customer, service_type
+ORDER BY customer, service_type
+"""
+
+# Smart YTD totals: each group is cut off at its last month with revenue,
+# groups without any revenue keep the whole year
+REPORT_YTD_QUERY = """
+WITH months(name, num) AS (VALUES {months}),
+year_rows AS (
+    SELECT r.customer, r.service_type, m.num,
+           r.cost, r.target, r.revenue, r.receivables_collected,
+           MAX(CASE WHEN r.revenue > 0 THEN m.num END)
+               OVER (PARTITION BY r.customer, r.service_type) AS last_revenue_month
+    FROM {table} r JOIN months m ON m.name = r.month
+    WHERE r.year = ?
+)
+SELECT customer, service_type,
+       TOTAL(CASE WHEN included THEN cost END), TOTAL(CASE WHEN included THEN target END),
+       TOTAL(CASE WHEN included THEN revenue END), TOTAL(CASE WHEN included THEN receivables_collected END)
+FROM (SELECT *, last_revenue_month IS NULL OR num <= last_revenue_month AS included FROM year_rows)
+GROUP BY customer, service_type
+ORDER BY customer, service_type
+"""
+
+# Trailing-window totals over a continuous year * 12 + month index, so windows may span years
+REPORT_TRAILING_QUERY = """
+WITH months(name, num) AS (VALUES {months})
+SELECT r.customer, r.service_type,
+       TOTAL(r.cost), TOTAL(r.target), TOTAL(r.revenue), TOTAL(r.receivables_collected)
+FROM {table} r JOIN months m ON m.name = r.month
+WHERE r.year BETWEEN ? AND ? AND r.year * 12 + m.num - 1 BETWEEN ? AND ?
+GROUP BY r.customer, r.service_type
+ORDER BY r.customer, r.service_type
+"""
+
+# Window lengths in months of the default trailing reports (T3M, T6M, T12M)
+TRAILING_WINDOWS = [3, 6, 12]
+
+# Comparison bases: the period just before (MoM/QoQ/trailing), or the same period a year earlier (YoY)
+COMPARISON_BASES = ['previous', 'year']
+
+# Fixed metric columns of a columnar PeriodReport
+REPORT_METRICS = ['cost', 'target', 'revenue', 'receivables_collected',
+                  'achievement_pct', 'gross_profit_pct', 'collection_rate_pct']
+
+# Distinct reports kept in memory per service instance
+REPORT_CACHE_SIZE = 64
+
+# Compact JSON output drops all indentation and spacing
+JSON_COMPACT_SEPARATORS = (',', ':')
+GZIP_SUFFIX = '.gz'
+# Rows encoded per chunk when streaming JSON, and the gzip level (the gzip tool's default)
+JSON_BATCH_ROWS = 1000
+GZIP_LEVEL = 6
+
+# Bump when the layout of the bundled report file changes
+BUNDLE_FORMAT_VERSION = 1
+
+# Bump when the layout of the customer x month pivot file changes
+PIVOT_FORMAT_VERSION = 1
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise numerator / denominator, 0 where the denominator is not positive"""
+    result = np.zeros(np.shape(numerator), dtype=float)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """Identify a source file by path, size, mtime and content hash"""
+    status = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {
+        'path': os.path.abspath(path),
+        'size': status.st_size,
+        'mtime_ns': status.st_mtime_ns,
+        'sha256': digest.hexdigest(),
+        'format': CACHE_FORMAT_VERSION
+    }
+
+
+def replace_file(temp_path: str, filename: str):
+    """Rename a finished temporary file over filename, with the permissions a plain open() would give
+
+    mkstemp creates private files; an existing file keeps its mode and a
+    new one gets 0o644.
+    """
+    mode = stat.S_IMODE(os.stat(filename).st_mode) if os.path.exists(filename) else 0o644
+    os.chmod(temp_path, mode)
+    os.replace(temp_path, filename)
+
+
+def write_frame_cache(cache_file: str, df: pd.DataFrame, fingerprint: Dict[str, Any]) -> bool:
+    """Write a columnar .npz sidecar of a parsed sheet; text columns are dictionary encoded
+
+    The file is written to a temporary name and renamed into place so a
+    concurrent reader never sees a partial cache. Returns False when the
+    frame holds values the sidecar cannot represent exactly.
+    """
+    arrays = {}
+    columns = []
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            arrays[f'values_{position}'] = series.to_numpy()
+            columns.append({'name': str(column), 'kind': 'values'})
+        else:
+            codes, categories = pd.factorize(series)
+            if not all(isinstance(value, str) for value in categories):
+                return False
+            arrays[f'codes_{position}'] = codes.astype(np.int32)
+            arrays[f'categories_{position}'] = np.array(list(categories), dtype=str)
+            columns.append({'name': str(column), 'kind': 'categorical'})
+
+    meta = {'fingerprint': fingerprint, 'columns': columns}
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    directory = os.path.dirname(os.path.abspath(cache_file))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix=CACHE_SUFFIX, dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        replace_file(temp_path, cache_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+
+def read_frame_cache(cache_file: str, fingerprint: Dict[str, Any],
+                     years: List[int] = None) -> Optional[pd.DataFrame]:
+    """Read a sidecar written by write_frame_cache, or None if it is missing or stale
+
+    With years, only rows of those years are decoded, so memory scales with
+    the selected rows rather than the whole sheet.
+    """
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with np.load(cache_file, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['fingerprint'] != fingerprint:
+                return None
+
+            rows = slice(None)
+            if years is not None:
+                position = [column['name'] for column in meta['columns']].index('Year')
+                rows = np.isin(data[f'values_{position}'], years)
+
+            columns = {}
+            for position, column in enumerate(meta['columns']):
+                if column['kind'] == 'values':
+                    columns[column['name']] = data[f'values_{position}'][rows]
+                else:
+                    categorical = pd.Categorical.from_codes(
+                        data[f'codes_{position}'][rows], data[f'categories_{position}'].astype(object)
+                    )
+                    columns[column['name']] = np.asarray(categorical, dtype=object)
+            return pd.DataFrame(columns)
+    except (OSError, ValueError, KeyError):
+        # A corrupt or foreign sidecar is treated like a cache miss
+        return None
+
+
+def _cell_text(value: Any) -> Optional[str]:
+    """A text cell as read_excel(dtype=str) parses it; None for blanks, errors and NA markers"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return None if value in STR_NA_VALUES or value in EXCEL_ERROR_CODES else value
+    if isinstance(value, float) and value.is_integer():
+        # Whole numbers are read as integers, so 7.0 becomes '7'
+        return str(int(value))
+    return str(value)
+
+
+def _cell_number(value: Any) -> float:
+    """A metric cell as a float, with blanks, errors and NA markers as 0 like the filled frame"""
+    if value is None or (isinstance(value, str) and (value in STR_NA_VALUES or value in EXCEL_ERROR_CODES)):
+        return 0.0
+    number = float(value)
+    return 0.0 if number != number else number
+
+
+def stream_month_groups(excel_file: str, years: List[int] = None
+                        ) -> Tuple[Dict[Tuple[int, str, str], array], int]:
+    """Read the first sheet of a workbook row by row into per-group row buffers
+    
+    Rows are read with openpyxl in read-only mode and appended to one buffer
+    per (year, customer, service_type) group as len(MonthCube.LAYERS) packed
+    doubles: the month number and the METRIC_COLUMNS values. Only those five
+    numbers of a row are kept, not the sheet or its text cells. Cells are
+    interpreted as read_excel parses them and rows keep sheet order, so
+    MonthCube.from_groups gives exactly the cube of the pandas path. Returns
+    the groups and the number of rows kept by the years filter.
+    """
+    from openpyxl import load_workbook
+    
+    years = set(years) if years is not None else None
+    groups = {}
+    records = 0
+    blank_rows = 0
+    
+    workbook = load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        # Dimensions stored in the file can be stale; let the reader find the real extent
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, ())
+        positions = {}
+        for position, name in enumerate(header):
+            positions.setdefault(name, position)
+        missing = [column for column in MASTER_COLUMNS if column not in positions]
+        if missing:
+            raise ValueError(f"Missing columns in {excel_file}: {', '.join(missing)}")
+        width = max(positions[column] for column in MASTER_COLUMNS) + 1
+        customer_at, service_at, year_at, month_at = (positions[column] for column in MASTER_COLUMNS[:4])
+        metric_at = [positions[column] for column in METRIC_COLUMNS]
+        
+        for row in rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                blank_rows += 1
+                continue
+            if years is None:
+                # Blank rows count like read_excel's, unless they trail the sheet
+                records += blank_rows
+            blank_rows = 0
+            year = row[year_at]
+            if isinstance(year, str):
+                year = None if year in STR_NA_VALUES or year in EXCEL_ERROR_CODES else float(year)
+            if years is not None and year not in years:
+                continue
+            records += 1
+            if year is None or year != year:
+                continue
+            
+            month = MONTH_INDEX.get(_cell_text(row[month_at]))
+            customer = _cell_text(row[customer_at])
+            service_type = _cell_text(row[service_at])
+            if month is None or customer is None or service_type is None:
+                continue
+            
+            key = (int(year), customer, service_type)
+            rows_of_group = groups.get(key)
+            if rows_of_group is None:
+                # Packed doubles, not lists of float objects
+                rows_of_group = groups[key] = array('d')
+            rows_of_group.append(month + 1)
+            rows_of_group.extend(_cell_number(row[position]) for position in metric_at)
+    finally:
+        workbook.close()
+    return groups, records
+
+
+def load_etl_state(state_file: str, scope: str) -> Optional[List[List[Any]]]:
+    """Group fingerprints saved by the previous incremental run of a scope, if any"""
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('format') != ETL_STATE_FORMAT_VERSION:
+        return None
+    return state['scopes'].get(scope)
+
+
+def save_etl_state(state_file: str, scope: str, fingerprints: Dict[Tuple[str, str, int], List[str]]):
+    """Persist a scope's group fingerprints for the next incremental run (temp file + rename)
+
+    Each scope (an output kind and year) keeps its own fingerprints, so a run
+    for one year or output never hides changes from another.
+    """
+    state = {'format': ETL_STATE_FORMAT_VERSION, 'scopes': {}}
+    if os.path.exists(state_file):
+        try:
+            with open(state_file) as f:
+                existing = json.load(f)
+            if existing.get('format') == ETL_STATE_FORMAT_VERSION:
+                state = existing
+        except (OSError, ValueError):
+            pass
+
+    state['scopes'][scope] = [
+        [customer, service_type, year, digests]
+        for (customer, service_type, year), digests in fingerprints.items()
+    ]
+
+    directory = os.path.dirname(os.path.abspath(state_file))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        replace_file(temp_path, state_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def iter_json(data: Any, compact: bool = False, batch_size: int = JSON_BATCH_ROWS) -> Iterator[str]:
+    """Encode data as JSON text chunks, batch_size rows at a time for reports and lists
+
+    The joined chunks equal json.dumps(data, indent=2), or the compact
+    separators with compact=True, without building the whole document
+    in memory first.
+    """
+    if compact:
+        encoder = json.JSONEncoder(separators=JSON_COMPACT_SEPARATORS)
+        opening, separator, closing = '[', ',', ']'
+    else:
+        encoder = json.JSONEncoder(indent=2)
+        opening, separator, closing = '[\n  ', ',\n  ', '\n]'
+
+    if isinstance(data, PeriodReport):
+        rows = data.iter_records()
+    elif isinstance(data, list):
+        rows = iter(data)
+    else:
+        yield encoder.encode(data)
+        return
+
+    empty = True
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        # A batch encodes exactly like a slice of the full array between its brackets
+        chunk = encoder.encode(batch)[len(opening):-len(closing)]
+        yield (opening if empty else separator) + chunk
+        empty = False
+    yield '[]' if empty else closing
+
+
+def write_text_atomic(filename: str, chunks: Iterable[str], compress: bool = False,
+                      skip_unchanged: bool = False) -> bool:
+    """Stream text chunks to filename through a temporary file and a rename
+
+    Readers only ever see the previous file or the complete new one.
+    compress gzips the output with a fixed header timestamp, so the same
+    content always gives the same bytes. With skip_unchanged an existing
+    file with identical bytes is kept. Returns whether the file was replaced.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix=os.path.splitext(filename)[1], dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            target = gzip.GzipFile(filename='', mode='wb', fileobj=raw,
+                                   compresslevel=GZIP_LEVEL, mtime=0) if compress else raw
+            with io.TextIOWrapper(target, encoding='utf-8', newline='') as text:
+                text.writelines(chunks)
+
+        if skip_unchanged and os.path.exists(filename) and filecmp.cmp(temp_path, filename, shallow=False):
+            os.remove(temp_path)
+            return False
+
+        replace_file(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+
+def period_month_range(period_type: str, month: int = None, quarter: int = None) -> Tuple[int, int]:
+    """Inclusive (first, last) month numbers covered by a MTD/QTD/YTD period"""
+    if period_type.lower() == 'month':
+        return month, month
+    elif period_type.lower() == 'quarter':
+        return 3 * quarter - 2, 3 * quarter
+    return 1, 12
+
+
+def window_totals(monthly: np.ndarray, first_month, last_month) -> np.ndarray:
+    """[..., layer] totals of the month slots first_month..last_month (1-based, inclusive) of [..., month, layer]
+    
+    The bounds may be arrays over the leading axes, such as a per-group
+    cutoff. Slots are added one at a time in month order instead of taken as
+    a difference of cumulative sums, whose cancellation error can move a
+    total across a rounding boundary; a window holds only a few slots, so the
+    cost per group stays constant.
+    """
+    first = np.asarray(first_month)
+    last = np.asarray(last_month)
+    totals = np.zeros(monthly.shape[:-2] + monthly.shape[-1:])
+    if first.size == 0 or last.size == 0:
+        return totals
+    for month in range(max(int(first.min()), 1), min(int(last.max()), monthly.shape[-2]) + 1):
+        inside = (first <= month) & (month <= last)
+        totals += np.where(inside[..., None], monthly[..., month - 1, :], 0.0)
+    return totals
+
+
+def pairwise_sum(block: np.ndarray) -> np.ndarray:
+    """[group, column] sums of a [group, row, column] block along the rows, bit for bit like np.sum
+
+    Follows numpy's pairwise summation of a 1-D array (eight interleaved
+    accumulators over runs of up to 128 values, halved recursively above
+    that), so a group's total equals groupby/Series.sum over its rows in the
+    same order, but all groups of one size are added in one pass.
+    """
+    rows = block.shape[1]
+    if rows < 8:
+        totals = np.zeros(block.shape[:1] + block.shape[2:])
+        for row in range(rows):
+            totals = totals + block[:, row]
+        return totals
+    if rows <= 128:
+        partial = block[:, :8].copy()
+        stop = rows - rows % 8
+        for row in range(8, stop, 8):
+            partial += block[:, row:row + 8]
+        totals = (((partial[:, 0] + partial[:, 1]) + (partial[:, 2] + partial[:, 3])) +
+                  ((partial[:, 4] + partial[:, 5]) + (partial[:, 6] + partial[:, 7])))
+        for row in range(stop, rows):
+            totals = totals + block[:, row]
+        return totals
+    half = rows // 2
+    half -= half % 8
+    return pairwise_sum(block[:, :half]) + pairwise_sum(block[:, half:])
+
+
+def grouped_sums(group_ids: np.ndarray, values: np.ndarray, groups: int) -> np.ndarray:
+    """[group, column] sums of values [row, column] whose sorted group_ids run 0..groups - 1
+
+    Each group's rows are summed in their order in values with
+    pairwise_sum, so totals match a groupby sum of the same rows exactly.
+    """
+    counts = np.bincount(group_ids, minlength=groups)
+    starts = np.cumsum(counts) - counts
+    totals = np.zeros((groups, values.shape[1]))
+    for count in np.unique(counts[counts > 0]):
+        members = np.flatnonzero(counts == count)
+        totals[members] = pairwise_sum(values[starts[members][:, None] + np.arange(count)])
+    return totals
+
+
+def trailing_month_range(year: int, month: int, months: int) -> Tuple[int, int]:
+    """Inclusive (first, last) continuous month indexes (year * 12 + month - 1) of a trailing window"""
+    if not 1 <= month <= 12 or months is None or months < 1:
+        raise ValueError(f"Trailing window needs month 1-12 and at least one month, got {month} and {months}")
+    last = year * 12 + month - 1
+    return last - months + 1, last
+
+
+def comparison_period(period_type: str, year: int, month: int = None, quarter: int = None, months: int = None,
+                      basis: str = 'previous') -> Tuple[int, int, int]:
+    """(year, month, quarter) of the period a report is compared against
+
+    basis 'previous' steps back one period (the previous month, quarter or
+    year, or the preceding trailing window); 'year' takes the same period of
+    the previous year.
+    """
+    period_type = period_type.lower()
+    if basis not in COMPARISON_BASES:
+        raise ValueError(f"Comparison basis must be one of {', '.join(COMPARISON_BASES)}: {basis}")
+    if basis == 'year' or period_type == 'year':
+        return year - 1, month, quarter
+    if period_type == 'month':
+        return (year, month - 1, quarter) if month > 1 else (year - 1, 12, quarter)
+    if period_type == 'quarter':
+        return (year, month, quarter - 1) if quarter > 1 else (year - 1, month, 4)
+    # A trailing window is followed by the window of the same length just before it
+    first, _ = trailing_month_range(year, month, months)
+    return (first - 1) // 12, (first - 1) % 12 + 1, quarter
+
+
+def forecast_landing(revenue: np.ndarray, actual_months) -> Tuple[np.ndarray, np.ndarray]:
+    """Full-year (run-rate, linear-trend) revenue projections of [..., 12] monthly revenue
+
+    actual_months, a count or one per series, is how many leading months
+    are booked actuals; the rest are projected. The run-rate extends the
+    monthly average of the actuals over the remaining months. The trend fits
+    revenue = a + b * month to the actuals and adds its remaining months,
+    clipped at zero; series with the same number of actual months share one
+    least-squares solve (one column per series). With fewer than two actual
+    months there is no trend, so it equals the run-rate, and series without
+    actuals project zero.
+    """
+    actual_months = np.broadcast_to(np.asarray(actual_months, dtype=np.int64), revenue.shape[:-1])
+    if actual_months.size and (actual_months.min() < 0 or actual_months.max() > 12):
+        raise ValueError(f"Actual months must be 0-12: {actual_months.min()}-{actual_months.max()}")
+    booked = np.arange(1, 13) <= actual_months[..., None]
+    actual_total = np.where(booked, revenue, 0.0).sum(axis=-1)
+    remaining = 12 - actual_months
+    run_rate = actual_total + safe_divide(actual_total, actual_months) * remaining
+    trend = run_rate.copy()
+
+    for count in np.unique(actual_months):
+        if count < 2 or count == 12:
+            continue
+        series = actual_months == count
+        design = np.column_stack([np.ones(count), np.arange(1, count + 1, dtype=float)])
+        coefficients, _, _, _ = np.linalg.lstsq(design, revenue[series][:, :count].T, rcond=None)
+        future = np.column_stack([np.ones(12 - count), np.arange(count + 1, 13, dtype=float)])
+        trend[series] = actual_total[series] + np.clip(future @ coefficients, 0, None).sum(axis=0)
+    return run_rate, trend
+
+
+def rollup_grouping_sets(dimensions: List[str]) -> List[Tuple[str, ...]]:
+    """Grouping sets of SQL ROLLUP(dimensions): every prefix, finest first, down to the grand total"""
+    return [tuple(dimensions[:length]) for length in range(len(dimensions), -1, -1)]
+
+
+def cube_grouping_sets(dimensions: List[str]) -> List[Tuple[str, ...]]:
+    """Grouping sets of SQL CUBE(dimensions): every subset, finest first, down to the grand total"""
+    return [
+        grouping_set
+        for length in range(len(dimensions), -1, -1)
+        for grouping_set in combinations(dimensions, length)
+    ]
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak traced memory and row counts per ETL stage
+
+    Stages nest (a slide builds reports, a load normalizes); each records its
+    own peak of memory allocated while it ran, measured with tracemalloc.
+    Stages whose name matches cprofile_stage (an fnmatch pattern) are also
+    run under cProfile. A service without a profiler skips all of this.
+    """
+
+    def __init__(self, trace_memory: bool = True, cprofile_stage: str = None):
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.stages = []
+        self.cprofile_stats = []
+        self._stack = []
+        self._started = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        """Time the enclosed block; set 'rows_out' (or other keys) on the yielded record"""
+        record = {'stage': name, 'depth': len(self._stack), 'rows_in': rows_in, 'rows_out': None}
+        self.stages.append(record)
+
+        frame = {'start_memory': 0, 'peak_memory': 0}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak before resetting the counter for this stage
+                self._stack[-1]['peak_memory'] = max(self._stack[-1]['peak_memory'], peak)
+            tracemalloc.reset_peak()
+            frame['start_memory'] = current
+        self._stack.append(frame)
+
+        profile = None
+        if self.cprofile_stage and fnmatch(name, self.cprofile_stage):
+            profile = cProfile.Profile()
+            profile.enable()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_started
+            record['cpu_seconds'] = time.process_time() - cpu_started
+            if profile is not None:
+                profile.disable()
+                self.cprofile_stats.append((name, profile))
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['peak_memory'])
+                record['peak_memory_bytes'] = max(peak - frame['start_memory'], 0)
+                if self._stack:
+                    self._stack[-1]['peak_memory'] = max(self._stack[-1]['peak_memory'], peak)
+
+    def close(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_wall_seconds': round(time.perf_counter() - self._started, 6),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages
+        }
+
+    def print_table(self):
+        print(f"\n{'Stage':<48}{'Wall ms':>10}{'CPU ms':>10}{'Peak MiB':>10}{'Rows in':>10}{'Rows out':>10}")
+        for record in self.stages:
+            name = '  ' * record['depth'] + record['stage']
+            peak = (f"{record['peak_memory_bytes'] / 2 ** 20:.2f}"
+                    if record.get('peak_memory_bytes') is not None else '-')
+            rows_in = record['rows_in'] if record['rows_in'] is not None else '-'
+            rows_out = record['rows_out'] if record['rows_out'] is not None else '-'
+            print(f"{name[:47]:<48}{record.get('wall_seconds', 0) * 1000:>10.1f}"
+                  f"{record.get('cpu_seconds', 0) * 1000:>10.1f}{peak:>10}{rows_in:>10}{rows_out:>10}")
+        print(f"Total wall time: {(time.perf_counter() - self._started) * 1000:.1f} ms")
+
+        for name, profile in self.cprofile_stats:
+            print(f"\ncProfile of stage {name}:")
+            pstats.Stats(profile).sort_stats('cumulative').print_stats(25)
+
+
+class _NoStage:
+    """Stand-in for StageProfiler.stage when profiling is off"""
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+NO_STAGE = _NoStage()
+
+
+class MonthCube:
+    """Dense [year, customer, service_type, month, metric] cube of the master table
+
+    Metrics are stored per month, so the total of any month range is a sum
+    of at most twelve slots (window_totals) instead of a filter plus groupby,
+    and per year (year_totals) for full-year targets and row counts. A
+    row-count layer records which groups have data in a range, and the last
+    month with revenue is kept per group for the smart YTD cutoff.
+
+    The rows themselves are kept too, grouped by (year, customer,
+    service_type) in load order, and MTD/QTD/smart YTD report totals are
+    summed from them (grouped_sums) rather than from the month slots: a
+    groupby adds a group's rows in load order, and adding them month by
+    month instead can round a total one cent apart.
+    """
+
+    LAYERS = METRIC_COLUMNS + ['Rows']
+
+    def __init__(self, df: pd.DataFrame):
+        # Rows without a usable key cannot be placed in the cube
+        valid = ((df['Month_Num'] > 0) & df['Year'].notna() &
+                 df['Customer'].notna() & df['Service_Type'].notna())
+        df = df[valid]
+
+        customer_codes, customers = pd.factorize(df['Customer'], sort=True)
+        service_codes, service_types = pd.factorize(df['Service_Type'], sort=True)
+        self.customers = np.asarray(customers, dtype=object)
+        self.service_types = np.asarray(service_types, dtype=object)
+
+        years = df['Year'].to_numpy(dtype=np.int64)
+        first_year = int(years.min()) if len(years) else 0
+        last_year = int(years.max()) if len(years) else -1
+        self.years = np.arange(first_year, last_year + 1)
+
+        self._build(years - first_year, customer_codes, service_codes,
+                    df['Month_Num'].to_numpy(dtype=np.int64), df[METRIC_COLUMNS].to_numpy(dtype=float))
+
+    def _build(self, year_codes: np.ndarray, customer_codes: np.ndarray, service_codes: np.ndarray,
+               month_num: np.ndarray, values: np.ndarray):
+        """Month slots, YTD cutoffs and the row store from coded rows in load order"""
+        shape = (len(self.years), len(self.customers), len(self.service_types), 12)
+        cells = np.ravel_multi_index((year_codes, customer_codes, service_codes, month_num - 1), shape)
+        size = int(np.prod(shape))
+
+        monthly = np.empty(shape + (len(self.LAYERS),))
+        for layer in range(len(METRIC_COLUMNS)):
+            monthly[..., layer] = np.bincount(cells, weights=values[:, layer], minlength=size).reshape(shape)
+        monthly[..., -1] = np.bincount(cells, minlength=size).reshape(shape)
+
+        # Last month number (1-12) with revenue > 0 per group, 0 when none
+        has_revenue = values[:, METRIC_COLUMNS.index('Revenue')] > 0
+        last_revenue_month = np.zeros(shape[:3], dtype=np.int64)
+        np.maximum.at(
+            last_revenue_month,
+            (year_codes[has_revenue], customer_codes[has_revenue], service_codes[has_revenue]),
+            month_num[has_revenue]
+        )
+
+        # Rows sorted by flat group number; the stable sort keeps load order within a group
+        groups = np.ravel_multi_index((year_codes, customer_codes, service_codes), shape[:3])
+        order = np.argsort(groups, kind='stable')
+        self.row_groups = groups[order]
+        self.row_months = month_num[order].astype(np.int8)
+        self.row_values = values[order]
+
+        self.monthly = monthly
+        self.year_totals = monthly.sum(axis=3)
+        self.last_revenue_month = last_revenue_month
+        self._timeline = None
+
+    @classmethod
+    def from_groups(cls, groups: Dict[Tuple[int, str, str], array]) -> 'MonthCube':
+        """Cube from per-group row buffers, as filled by stream_month_groups
+
+        groups maps (year, customer, service_type) to the group's rows in
+        load order, len(LAYERS) doubles each: the month number (1-12) and
+        the METRIC_COLUMNS values.
+        """
+        cube = cls.__new__(cls)
+        cube.customers = np.array(sorted({customer for _, customer, _ in groups}), dtype=object)
+        cube.service_types = np.array(sorted({service_type for _, _, service_type in groups}), dtype=object)
+        years = [year for year, _, _ in groups]
+        cube.years = np.arange(min(years), max(years) + 1) if years else np.arange(0)
+
+        customer_codes = {customer: code for code, customer in enumerate(cube.customers)}
+        service_codes = {service_type: code for code, service_type in enumerate(cube.service_types)}
+        width = len(cls.LAYERS)
+        counts = [len(rows) // width for rows in groups.values()]
+        rows = np.concatenate([np.frombuffer(rows, dtype=float) for rows in groups.values()] + [np.empty(0)])
+        rows = rows.reshape(-1, width)
+        cube._build(
+            np.repeat([year - int(cube.years[0]) for year, _, _ in groups], counts).astype(np.int64),
+            np.repeat([customer_codes[customer] for _, customer, _ in groups], counts).astype(np.int64),
+            np.repeat([service_codes[service_type] for _, _, service_type in groups], counts).astype(np.int64),
+            rows[:, 0].astype(np.int64),
+            np.ascontiguousarray(rows[:, 1:])
+        )
+        return cube
+
+    def for_year(self, year: int) -> 'MonthCube':
+        """Copy of the cube restricted to one year, compact enough to send to a worker"""
+        position = self._year_position(year)
+        positions = slice(position, position + 1) if position is not None else slice(0, 0)
+
+        subset = MonthCube.__new__(MonthCube)
+        subset.customers = self.customers
+        subset.service_types = self.service_types
+        subset.years = self.years[positions].copy()
+        subset.monthly = self.monthly[positions].copy()
+        subset.year_totals = self.year_totals[positions].copy()
+        subset.last_revenue_month = self.last_revenue_month[positions].copy()
+        rows, first_group = self._year_rows(position) if position is not None else (slice(0, 0), 0)
+        # Group numbers restart at 0 in the one-year cube
+        subset.row_groups = self.row_groups[rows] - first_group
+        subset.row_months = self.row_months[rows].copy()
+        subset.row_values = self.row_values[rows].copy()
+        subset._timeline = None
+        return subset
+
+    def month_records(self) -> List[Tuple[str, str, int, str, float, float, float, float]]:
+        """(customer, service_type, year, month name, cost, target, revenue, receivables) per cell with rows
+
+        Duplicate master rows for the same customer/service/year/month are
+        summed, matching how every report aggregates them.
+        """
+        year_idx, customer_idx, service_idx, month_idx = np.nonzero(self.monthly[..., -1] > 0)
+        values = self.monthly[year_idx, customer_idx, service_idx, month_idx, :len(METRIC_COLUMNS)]
+        return list(zip(
+            [str(customer) for customer in self.customers[customer_idx]],
+            [str(service_type) for service_type in self.service_types[service_idx]],
+            self.years[year_idx].tolist(),
+            [MONTH_NAMES[month] for month in month_idx],
+            *values.T.tolist()
+        ))
+
+    def group_fingerprints(self, year: int = None) -> Dict[Tuple[str, str, int], List[str]]:
+        """Per-month content digests of every Customer/Service_Type/Year group with rows"""
+        fingerprints = {}
+        has_rows = self.year_totals[..., -1] > 0
+        if year is not None:
+            has_rows &= (self.years == year)[:, None, None]
+        year_idx, customer_idx, service_idx = np.nonzero(has_rows)
+        for y, c, s in zip(year_idx, customer_idx, service_idx):
+            months = np.ascontiguousarray(self.monthly[y, c, s])
+            key = (str(self.customers[c]), str(self.service_types[s]), int(self.years[y]))
+            fingerprints[key] = [
+                hashlib.blake2b(month.tobytes(), digest_size=8).hexdigest() for month in months
+            ]
+        return fingerprints
+
+    def _year_position(self, year: int):
+        position = year - int(self.years[0]) if len(self.years) else -1
+        return position if 0 <= position < len(self.years) else None
+
+    def _year_rows(self, position: int) -> Tuple[slice, int]:
+        """Range of a year's rows in the row store and the group number its groups start from"""
+        first_group = position * len(self.customers) * len(self.service_types)
+        last_group = first_group + len(self.customers) * len(self.service_types)
+        start, stop = np.searchsorted(self.row_groups, [first_group, last_group])
+        return slice(int(start), int(stop)), first_group
+
+    def year_row_totals(self, position: int, first_month: int, last_month) -> np.ndarray:
+        """[customer, service_type, layer] totals of a year's rows in a month range, summed in load order
+
+        last_month may be a [customer, service_type] array, such as the
+        smart YTD cutoff.
+        """
+        rows, first_group = self._year_rows(position)
+        groups_per_year = len(self.customers) * len(self.service_types)
+        groups = self.row_groups[rows] - first_group
+        months = self.row_months[rows]
+        last = np.asarray(last_month)
+        if last.ndim:
+            last = last.reshape(-1)[groups]
+        inside = (months >= first_month) & (months <= last)
+
+        totals = np.empty((groups_per_year, len(self.LAYERS)))
+        totals[:, :-1] = grouped_sums(groups[inside], self.row_values[rows][inside], groups_per_year)
+        totals[:, -1] = np.bincount(groups[inside], minlength=groups_per_year)
+        return totals.reshape(len(self.customers), len(self.service_types), len(self.LAYERS))
+
+    def range_totals(self, year: int, first_month: int, last_month: int) -> np.ndarray:
+        """[customer, service_type, layer] totals for an inclusive month range"""
+        position = self._year_position(year)
+        if position is None:
+            return np.zeros((len(self.customers), len(self.service_types), len(self.LAYERS)))
+
+        return self.year_row_totals(position, first_month, last_month)
+
+    def timeline(self) -> np.ndarray:
+        """[customer, service_type, month index, layer] month slots of all years in one axis
+
+        Month index i is month i % 12 + 1 of the cube's year i // 12, so a
+        window that spans years is a run of consecutive slots. Built on first use.
+        """
+        if self._timeline is None:
+            years, customers, service_types, _, layers = self.monthly.shape
+            self._timeline = np.ascontiguousarray(
+                self.monthly.transpose(1, 2, 0, 3, 4)).reshape(customers, service_types, years * 12, layers)
+        return self._timeline
+
+    def trailing_totals(self, year: int, month: int, months: int) -> np.ndarray:
+        """[customer, service_type, layer] totals of the months-long window ending at month of year"""
+        first, last = trailing_month_range(year, month, months)
+        origin = int(self.years[0]) * 12 if len(self.years) else 0
+        # Months outside the cube hold no rows
+        start = min(max(first - origin, 0), len(self.years) * 12)
+        end = min(max(last - origin + 1, 0), len(self.years) * 12)
+        if start >= end:
+            return np.zeros((len(self.customers), len(self.service_types), len(self.LAYERS)))
+        return window_totals(self.timeline(), start + 1, end)
+
+    def ytd_smart_totals(self, year: int) -> np.ndarray:
+        """[customer, service_type, layer] YTD totals cut off at each group's last revenue month"""
+        position = self._year_position(year)
+        if position is None:
+            return np.zeros((len(self.customers), len(self.service_types), len(self.LAYERS)))
+
+        # Groups without any revenue keep the whole year
+        last_revenue_month = self.last_revenue_month[position]
+        cutoff = np.where(last_revenue_month > 0, last_revenue_month, 12)
+        totals = self.year_row_totals(position, 1, cutoff)
+
+        # Group membership follows the rows of the whole year, not only the cut-off months
+        totals[..., -1] = self.year_totals[position, ..., -1]
+        return totals
+
+    def landing_forecast(self, year: int, as_of: int) -> pd.DataFrame:
+        """Projected full-year revenue of every group with rows in the year, from actuals up to as_of
+
+        Like the smart YTD, a group's actuals end at its last month with
+        revenue when that comes before as_of: later months are not booked
+        yet and are projected rather than read as zero. Columns are Customer,
+        Service_Type, the revenue to date, the target of all twelve months
+        and the run-rate and trend projections of forecast_landing, in the
+        row order of the YTD report.
+        """
+        if not 1 <= as_of <= 12:
+            raise ValueError(f"Forecast month must be 1-12: {as_of}")
+        position = self._year_position(year)
+        if position is None:
+            return pd.DataFrame(columns=['Customer', 'Service_Type', 'revenue_to_date', 'full_year_target',
+                                         'run_rate_revenue', 'trend_revenue'])
+        customer_idx, service_idx = np.nonzero(self.year_totals[position, ..., -1] > 0)
+        revenue = self.monthly[position, customer_idx, service_idx, :, METRIC_COLUMNS.index('Revenue')]
+        actual_months = np.minimum(self.last_revenue_month[position, customer_idx, service_idx], as_of)
+        run_rate, trend = forecast_landing(revenue, actual_months)
+        return pd.DataFrame({
+            'Customer': self.customers[customer_idx],
+            'Service_Type': self.service_types[service_idx],
+            'revenue_to_date': window_totals(revenue[..., None], 1, actual_months)[:, 0],
+            'full_year_target': self.year_totals[position, customer_idx, service_idx, METRIC_COLUMNS.index('Target')],
+            'run_rate_revenue': run_rate,
+            'trend_revenue': trend
+        })
+
+    def to_frame(self, totals: np.ndarray) -> pd.DataFrame:
+        """Group totals as a frame, keeping only groups with rows in the period"""
+        customer_idx, service_idx = np.nonzero(totals[..., -1] > 0)
+        frame = pd.DataFrame({
+            'Customer': self.customers[customer_idx],
+            'Service_Type': self.service_types[service_idx]
+        })
+        for layer, column in enumerate(METRIC_COLUMNS):
+            frame[column] = totals[customer_idx, service_idx, layer]
+        return frame
+
+    def period_totals(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                      months: int = None) -> pd.DataFrame:
+        """Customer/Service_Type totals for a MTD, QTD, smart YTD or trailing months-long period"""
+        if period_type.lower() == 'year':
+            return self.to_frame(self.ytd_smart_totals(year))
+        if period_type.lower() == 'trailing':
+            return self.to_frame(self.trailing_totals(year, month, months))
+        first_month, last_month = period_month_range(period_type, month, quarter)
+        return self.to_frame(self.range_totals(year, first_month, last_month))
+
+
+class GroupIndex:
+    """Master rows sorted by (Customer, Service_Type, Year, Month) with the row range of every group
+
+    The sort is stable, so rows of the same month keep their load order. offsets maps each
+    (customer, service_type, year) to its [start, stop) range in the sorted
+    arrays, so a group is found with one dict lookup and read as a slice
+    instead of a mask over the whole frame. Rows without a customer,
+    service type or year belong to no group.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        customer_codes = df['Customer'].cat.codes.to_numpy()
+        service_codes = df['Service_Type'].cat.codes.to_numpy()
+        years = df['Year'].to_numpy(dtype=float)
+        month_num = df['Month_Num'].to_numpy()
+        positions = np.flatnonzero((customer_codes >= 0) & (service_codes >= 0) & ~np.isnan(years))
+        # Years are bucketed like the month cube buckets them
+        year_keys = years[positions].astype(np.int64)
+        order = np.lexsort((month_num[positions], year_keys, service_codes[positions], customer_codes[positions]))
+        self.rows = positions[order]
+
+        self.month_num = month_num[self.rows]
+        self.metrics = df[METRIC_COLUMNS].to_numpy(dtype=float)[self.rows]
+
+        # A group starts wherever the customer, service type or year changes
+        customers, service_types, years = customer_codes[self.rows], service_codes[self.rows], year_keys[order]
+        changed = np.ones(len(self.rows), dtype=bool)
+        changed[1:] = ((customers[1:] != customers[:-1]) | (service_types[1:] != service_types[:-1]) |
+                       (years[1:] != years[:-1]))
+        starts = np.flatnonzero(changed)
+        stops = np.append(starts[1:], len(self.rows))
+        customer_names = df['Customer'].cat.categories
+        service_names = df['Service_Type'].cat.categories
+        self.offsets = {
+            (customer_names[customers[start]], service_names[service_types[start]], int(years[start])): (start, stop)
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        }
+
+    def group_slice(self, customer: str, service_type: str, year: int) -> slice:
+        """Range of one group in the sorted arrays, empty when it has no rows"""
+        start, stop = self.offsets.get((customer, service_type, year), (0, 0))
+        return slice(start, stop)
+
+    def group_rows(self, customer: str, service_type: str, year: int) -> np.ndarray:
+        """Frame positions of one group's rows, in load order"""
+        return np.sort(self.rows[self.group_slice(customer, service_type, year)])
+
+    def last_revenue_month(self, customer: str, service_type: str, year: int) -> int:
+        """Last month number (1-12) with revenue > 0 for a group, 0 when none"""
+        group = self.group_slice(customer, service_type, year)
+        month_num = self.month_num[group]
+        revenue = self.metrics[group, METRIC_COLUMNS.index('Revenue')]
+        months = month_num[(revenue > 0) & (month_num > 0)]
+        return int(months.max()) if len(months) else 0
+
+    def window_totals(self, customer: str, service_type: str, year: int, first_month: int,
+                      last_month: int) -> np.ndarray:
+        """[layer] totals of one group's rows in an inclusive month range, with MonthCube.LAYERS
+
+        Rows are summed in load order, like the cube's report totals.
+        """
+        group = self.group_slice(customer, service_type, year)
+        order = np.argsort(self.rows[group], kind='stable')
+        month_num = self.month_num[group][order]
+        inside = (month_num >= max(first_month, 1)) & (month_num <= last_month)
+        totals = np.empty(len(MonthCube.LAYERS))
+        totals[:-1] = pairwise_sum(self.metrics[group][order][inside][None])[0]
+        totals[-1] = np.count_nonzero(inside)
+        return totals
+
+
+class SQLiteReportEngine:
+    """Report engine that pushes period aggregation down to a SQLite revenue table
+
+    Answers period_totals like MonthCube, but MTD/QTD/smart YTD are
+    translated into GROUP BY (and window function) queries so only the
+    group totals cross into Python. The table is expected in the layout
+    written by export_to_sqlite. Each query opens its own connection, so
+    the engine can be shared by concurrent readers.
+    """
+
+    def __init__(self, database_file: str, table: str = REVENUE_TABLE):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        if not os.path.exists(database_file):
+            raise FileNotFoundError(f"SQLite database not found: {database_file}")
+        self.database_file = database_file
+        self.table = table
+
+        connection = sqlite3.connect(database_file)
+        try:
+            with connection:
+                connection.execute(REPORT_ENGINE_INDEX.format(table=table))
+            self.records = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            connection.close()
+
+    def reopen(self) -> 'SQLiteReportEngine':
+        """New engine on the same database, e.g. for a reloaded service"""
+        return SQLiteReportEngine(self.database_file, self.table)
+
+    def _query(self, sql: str, params: List[Any]) -> pd.DataFrame:
+        connection = sqlite3.connect(f"file:{os.path.abspath(self.database_file)}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+        frame = pd.DataFrame(rows, columns=['Customer', 'Service_Type'] + METRIC_COLUMNS)
+        frame[METRIC_COLUMNS] = frame[METRIC_COLUMNS].astype(float)
+        return frame
+
+    def period_totals(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                      months: int = None) -> pd.DataFrame:
+        """Customer/Service_Type totals for a MTD, QTD, smart YTD or trailing months-long period"""
+        if period_type.lower() in ('year', 'trailing'):
+            values = ', '.join('(?, ?)' for _ in MONTH_NAMES)
+            params = [value for num, name in enumerate(MONTH_NAMES, 1) for value in (name, num)]
+            if period_type.lower() == 'year':
+                return self._query(REPORT_YTD_QUERY.format(table=self.table, months=values), params + [year])
+            first, last = trailing_month_range(year, month, months)
+            return self._query(REPORT_TRAILING_QUERY.format(table=self.table, months=values),
+                               params + [first // 12, last // 12, first, last])
+
+        first_month, last_month = period_month_range(period_type, month, quarter)
+        names = MONTH_NAMES[first_month - 1:last_month]
+        sql = REPORT_RANGE_QUERY.format(table=self.table, months=', '.join('?' for _ in names))
+        return self._query(sql, [year] + names)
+
+
+class PeriodReport:
+    """Columnar Customer/Service_Type report for one period
+
+    The frame has fixed metric columns (REPORT_COLUMNS, rounded the same way
+    as the JSON output) and the period is described by attributes, so
+    consumers never parse it out of column names. to_records() produces the
+    legacy list of dicts keyed like "Q2 2025 Target" for the JSON boundary.
+    Reports may be shared through the report cache and must not be mutated.
+    """
+
+    REPORT_COLUMNS = ['Customer', 'Service_Type'] + REPORT_METRICS
+
+    # Legacy column suffix for each metric in the dict format
+    RECORD_SUFFIXES = {
+        'cost': 'Cost',
+        'target': 'Target',
+        'revenue': 'Revenue',
+        'receivables_collected': 'Receivables Collected',
+        'achievement_pct': 'Ach. %',
+        'gross_profit_pct': 'Gross Profit %',
+        'collection_rate_pct': 'Receivables Collected Rate %',
+        # Landing forecast columns of build_forecast_report
+        'full_year_target': 'Full Year Target',
+        'run_rate_revenue': 'Projected Revenue (Run-Rate)',
+        'run_rate_achievement_pct': 'Projected Ach. % (Run-Rate)',
+        'trend_revenue': 'Projected Revenue (Trend)',
+        'trend_achievement_pct': 'Projected Ach. % (Trend)'
+    }
+
+    def __init__(self, period_type: str, year: int, period_name: str, frame: pd.DataFrame,
+                 month: int = None, quarter: int = None, months: int = None):
+        self.period_type = period_type.lower()
+        self.year = year
+        self.month = month
+        self.quarter = quarter
+        # Window length of a trailing report
+        self.months = months
+        self.period_name = period_name
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def record_columns(self) -> List[str]:
+        """Legacy column names ("Q2 2025 Target") in frame column order"""
+        return [
+            f"{self.period_name} {self.RECORD_SUFFIXES[column]}" if column in self.RECORD_SUFFIXES else column
+            for column in self.frame.columns
+        ]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Rows in the legacy dict format, produced one at a time"""
+        columns = self.record_columns()
+        for values in zip(*(self.frame[column].tolist() for column in self.frame.columns)):
+            yield dict(zip(columns, values))
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Rows in the legacy dict format with period-prefixed column names"""
+        return list(self.iter_records())
+
+
+class PeriodComparison(PeriodReport):
+    """Customer/Service_Type comparison of a period with an earlier one
+
+    The frame holds each COMPARED_METRICS value for the current and the
+    previous period ('previous_' prefix), its absolute change ('_change')
+    and, except for achievement, its percentage change ('_change_pct',
+    relative to the magnitude of the previous value, 0 when it was 0).
+    Achievement changes are in percentage points. status is 'new' for
+    groups without rows in the previous period, 'lost' for groups without
+    rows in the current one and 'continuing' otherwise. The period
+    attributes describe the current period.
+    """
+
+    COMPARED_METRICS = ['revenue', 'target', 'cost', 'gross_profit', 'achievement_pct']
+
+    METRIC_NAMES = {
+        'revenue': 'Revenue',
+        'target': 'Target',
+        'cost': 'Cost',
+        'gross_profit': 'Gross Profit',
+        'achievement_pct': 'Ach. %'
+    }
+
+    def __init__(self, period_type: str, year: int, period_name: str, previous_name: str, basis: str,
+                 frame: pd.DataFrame, month: int = None, quarter: int = None, months: int = None):
+        super().__init__(period_type, year, period_name, frame, month=month, quarter=quarter, months=months)
+        self.previous_name = previous_name
+        self.basis = basis
+
+    def record_columns(self) -> List[str]:
+        """Column names such as "Q2 2025 Revenue", "Q1 2025 Revenue" and "Revenue Change %" """
+        names = {'status': 'Status'}
+        for metric, name in self.METRIC_NAMES.items():
+            names[metric] = f"{self.period_name} {name}"
+            names[f"previous_{metric}"] = f"{self.previous_name} {name}"
+            names[f"{metric}_change"] = f"{name} Change"
+            names[f"{metric}_change_pct"] = f"{name} Change %"
+        return [names.get(column, column) for column in self.frame.columns]
+
+
+def ordered_sums(frame: pd.DataFrame, columns: List[str], by: str = None):
+    """Column sums added one row at a time in frame order, overall or per value of by
+
+    Totals of report rows are built up the way a running total over the
+    report would be, rather than with pandas' pairwise or compensated sums,
+    which can differ in the last bit and so round a slide total differently.
+    Groups of by come in order of first appearance.
+    """
+    values = frame[columns].to_numpy(dtype=float)
+    if by is None:
+        totals = np.cumsum(values, axis=0)[-1] if len(values) else np.zeros(len(columns))
+        return pd.Series(totals, index=columns)
+    codes, uniques = pd.factorize(frame[by], sort=False)
+    totals = np.zeros((len(uniques), len(columns)))
+    np.add.at(totals, codes, values)
+    return pd.DataFrame(totals, index=pd.Index(uniques, name=by), columns=columns)
+
+
+class SlideIntermediates:
+    """Shared intermediate results behind the presentation slides
+
+    The deck is a small DAG: the MTD/QTD/YTD reports of one year feed
+    company, service type and customer rollups, and every slide is a
+    projection of those. Each node is computed on first use and then reused
+    by all slides, so a full deck aggregates each report only once.
+    Periods are named 'mtd', 'qtd' and 'ytd'.
+    """
+
+    PERIOD_TYPES = {'mtd': 'month', 'qtd': 'quarter', 'ytd': 'year'}
+
+    def __init__(self, etl: 'ProceedETLService', year: int, current_month: int = 6, current_quarter: int = 2,
+                 forecast: bool = False):
+        self.etl = etl
+        self.year = year
+        self.current_month = current_month
+        self.current_quarter = current_quarter
+        # Landing slides also carry full-year projections from actuals up to current_month
+        self.forecast = forecast
+        self._nodes = {}
+
+    def _node(self, key: Tuple, compute):
+        if key not in self._nodes:
+            self._nodes[key] = compute()
+        return self._nodes[key]
+
+    def report(self, period: str) -> PeriodReport:
+        """Report of the current month, quarter or year"""
+        return self._node(('report', period), lambda: self.etl.build_report(
+            self.PERIOD_TYPES[period], self.year,
+            month=self.current_month if period == 'mtd' else None,
+            quarter=self.current_quarter if period == 'qtd' else None
+        ))
+
+    def company_totals(self, period: str) -> pd.Series:
+        """Cost/target/revenue/receivables summed over all customers"""
+        return self._node(('company', period), lambda: ordered_sums(
+            self.report(period).frame, ['cost', 'target', 'revenue', 'receivables_collected']))
+
+    def service_type_totals(self, period: str) -> pd.DataFrame:
+        """Cost/target/revenue per service type, in order of first appearance"""
+        return self._node(('service_type', period), lambda: ordered_sums(
+            self.report(period).frame, ['cost', 'target', 'revenue'], by='Service_Type'))
+
+    def customer_achievement(self, period: str, service_type: str = None) -> pd.DataFrame:
+        """Target, revenue and achievement % per customer, in order of first appearance"""
+        def compute() -> pd.DataFrame:
+            frame = self.report(period).frame
+            if service_type is not None:
+                # One row per customer within a service type, so the row's own achievement applies
+                frame = frame[frame['Service_Type'] == service_type]
+                return frame.set_index('Customer')[['target', 'revenue', 'achievement_pct']]
+
+            totals = ordered_sums(frame, ['target', 'revenue'], by='Customer')
+            totals['achievement_pct'] = safe_divide(totals['revenue'].to_numpy(), totals['target'].to_numpy()) * 100
+            return totals
+        return self._node(('customer', period, service_type), compute)
+
+    def landing_forecast(self) -> pd.DataFrame:
+        """Per-group full-year projections from actuals up to the current month"""
+        return self._node(('forecast',), lambda: self.etl.forecast(self.year, self.current_month))
+
+    def forecast_totals(self, by: str = None):
+        """Projection columns summed over all groups, or per value of column by in order of first appearance"""
+        columns = ['full_year_target', 'run_rate_revenue', 'trend_revenue']
+        if by is None:
+            return self._node(('forecast_totals',), lambda: self.landing_forecast()[columns].sum())
+        return self._node(('forecast_totals', by), lambda: self.landing_forecast().groupby(
+            by, sort=False)[columns].sum())
 
 
 class ProceedETLService:
-    def __init__(self, excel_file: str = "Master_Table.xlsx"):
-        """Initialize ETL service with Excel data source"""
+    def __init__(self, excel_file: str = "Master_Table.xlsx", use_cache: bool = True, rebuild_cache: bool = False,
+                 report_cache_size: int = REPORT_CACHE_SIZE, autoload: bool = True,
+                 profiler: StageProfiler = None, years: List[int] = None, extra_columns: List[str] = None,
+                 streaming: bool = False):
+        """Initialize ETL service with Excel data source
+
+        The workbook is read lazily, on first access to the data, and only
+        its MASTER_COLUMNS plus extra_columns (e.g. rollup dimensions) are
+        parsed. years restricts the load to those years. Parsed workbooks
+        are cached in a columnar sidecar next to the source;
+        use_cache=False always parses the Excel file and rebuild_cache=True
+        parses it and refreshes the sidecar. Generated reports are memoized
+        in an LRU of report_cache_size entries that is cleared on every load.
+        With autoload=False nothing is read until load_data, use_cube or
+        use_engine is called. streaming=True reads the workbook row by row
+        straight into the month cube (see stream_month_groups) instead
+        of parsing it into a frame; reports, slides and the SQLite sink work
+        as usual, but there are no master rows for rollup. A profiler
+        records every load, report, slide and export stage.
+        """
         self.excel_file = excel_file
-        self.df = None
-        self.load_data()
+        self.use_cache = use_cache
+        self.rebuild_cache = rebuild_cache
+        self.streaming = streaming
+        self.years = sorted(years) if years else None
+        self.columns = MASTER_COLUMNS + [column for column in extra_columns or [] if column not in MASTER_COLUMNS]
+        self._df = None
+        self._cube = None
+        # Answers period_totals: the month cube, or a SQLiteReportEngine
+        self._engine = None
+        # Set until the first access to the data triggers load_data
+        self._load_pending = autoload
+        self._load_lock = threading.RLock()
+        self.load_stats = {}
+        self.source_fingerprint = None
+        self.data_version = 0
+        self.report_cache_size = report_cache_size
+        self._report_cache = OrderedDict()
+        # Guards the LRU so concurrent readers (serve mode) can share the service
+        self._report_cache_lock = threading.Lock()
+        self.report_cache_hits = 0
+        self.report_cache_misses = 0
+        # (data_version, GroupIndex) for point queries, built on first use
+        self._group_index = None
+        self._group_index_lock = threading.Lock()
+        self.profiler = profiler
+    
+    def ensure_loaded(self):
+        """Run the pending lazy load now; concurrent first users wait for a single load"""
+        if self._load_pending:
+            with self._load_lock:
+                if self._load_pending:
+                    self._load_pending = False
+                    try:
+                        self.load_data()
+                    except BaseException:
+                        self._load_pending = True
+                        raise
+    
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        """Normalized master rows, loaded on first access"""
+        self.ensure_loaded()
+        return self._df
+    
+    @df.setter
+    def df(self, df: Optional[pd.DataFrame]):
+        self._df = df
+    
+    @property
+    def cube(self) -> Optional['MonthCube']:
+        """Month cube of the master rows, loaded on first access"""
+        self.ensure_loaded()
+        return self._cube
+    
+    @cube.setter
+    def cube(self, cube: Optional['MonthCube']):
+        self._cube = cube
+    
+    @property
+    def engine(self):
+        """Source of period totals (MonthCube or SQLiteReportEngine), loaded on first access"""
+        self.ensure_loaded()
+        return self._engine
+    
+    @engine.setter
+    def engine(self, engine):
+        self._engine = engine
+    
+    def stage(self, name: str, rows_in: int = None):
+        """Profiler stage context for a unit of work, a no-op without a profiler"""
+        if self.profiler is None:
+            return NO_STAGE
+        return self.profiler.stage(name, rows_in)
+    
+    @property
+    def cache_file(self) -> str:
+        """Sidecar cache path for the Excel source"""
+        return f"{self.excel_file}{CACHE_SUFFIX}"
+    
+    def parse_workbook(self) -> pd.DataFrame:
+        """Parse only the needed columns of the workbook, with explicit types"""
+        dtypes = {column: dtype for column, dtype in MASTER_DTYPES.items() if column in self.columns}
+        return pd.read_excel(self.excel_file, usecols=self.columns, dtype=dtypes)
+    
+    def select_years(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of the requested years (all rows when no years were given)"""
+        if self.years is None:
+            return df
+        return df[df['Year'].isin(self.years)].reset_index(drop=True)
+    
+    def read_master_table(self) -> Tuple[pd.DataFrame, str]:
+        """Read the raw master table, from the sidecar cache when it matches the source
+        
+        The sidecar holds every year of the parsed columns, so one cache serves
+        runs for any year range.
+        """
+        fingerprint = file_fingerprint(self.excel_file)
+        self.source_fingerprint = fingerprint
+        # A sidecar only matches when it was written for the same column projection
+        cache_key = dict(fingerprint, columns=self.columns)
+        if not self.use_cache:
+            return self.select_years(self.parse_workbook()), 'excel'
+        
+        if not self.rebuild_cache:
+            cached_df = read_frame_cache(self.cache_file, cache_key, self.years)
+            if cached_df is not None:
+                return cached_df, 'cache'
+        
+        df = self.parse_workbook()
+        status = os.stat(self.excel_file)
+        if (status.st_size, status.st_mtime_ns) != (fingerprint['size'], fingerprint['mtime_ns']):
+            # The workbook was rewritten while parsing; do not key this frame on the old fingerprint
+            return self.select_years(df), 'excel'
+        
+        try:
+            written = write_frame_cache(self.cache_file, df, cache_key)
+        except OSError as e:
+            print(f"Warning: could not write cache {self.cache_file}: {e}")
+            written = False
+        return self.select_years(df), 'excel+cache' if written else 'excel'
+    
+    def normalize_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fill metric gaps and integer-code the dimension columns
+
+        Customer and Service_Type become categoricals, Month an ordered
+        categorical with an int8 Month_Num (1-12, 0 for unrecognised names)
+        and Year is downcast, so period filters compare small integers.
+        """
+        df = df.copy()
+        # Fill NaN values with 0 for calculations
+        df[METRIC_COLUMNS] = df[METRIC_COLUMNS].fillna(0)
+        
+        df['Customer'] = df['Customer'].astype('category')
+        df['Service_Type'] = df['Service_Type'].astype('category')
+        df['Month'] = pd.Categorical(df['Month'], categories=MONTH_NAMES, ordered=True)
+        df['Month_Num'] = (df['Month'].cat.codes + 1).astype(np.int8)
+        df['Year'] = pd.to_numeric(df['Year'], downcast='integer')
+        return df
+    
+    def load_frame(self, raw_df: pd.DataFrame):
+        """Normalize an in-memory master table and serve reports from it"""
+        self._load_pending = False
+        with self.stage('normalize', rows_in=len(raw_df)) as stage:
+            df = self.normalize_frame(raw_df)
+            stage['rows_out'] = len(df)
+        # Pre-aggregate once so every period query is an array lookup
+        with self.stage('cube', rows_in=len(df)) as stage:
+            cube = MonthCube(df)
+            stage['rows_out'] = int(np.count_nonzero(cube.monthly[..., -1]))
+        with self._report_cache_lock:
+            self.df = df
+            self.cube = cube
+            self.engine = cube
+            # Reports computed from the previous data are no longer valid
+            self.data_version += 1
+            self._report_cache.clear()
+    
+    def stream_data(self) -> Tuple[MonthCube, int]:
+        """Build the month cube from the workbook's numbers only, bypassing the frame and its cache"""
+        self.source_fingerprint = file_fingerprint(self.excel_file)
+        with self.stage('stream') as stage:
+            groups, records = stream_month_groups(self.excel_file, self.years)
+            stage['rows_out'] = records
+        with self.stage('cube', rows_in=len(groups)) as stage:
+            cube = MonthCube.from_groups(groups)
+            stage['rows_out'] = int(np.count_nonzero(cube.monthly[..., -1]))
+        return cube, records
     
     def load_data(self):
         """Load data from Excel file"""
+        self._load_pending = False
         try:
-            self.df = pd.read_excel(self.excel_file)
-            # Fill NaN values with 0 for calculations
-            numeric_cols = ['Cost', 'Target', 'Revenue', 'Receivables Collected']
-            self.df[numeric_cols] = self.df[numeric_cols].fillna(0)
+            started = time.perf_counter()
+            if self.streaming:
+                cube, records = self.stream_data()
+                with self._report_cache_lock:
+                    self.df = None
+                    self.use_cube(cube)
+                elapsed = time.perf_counter() - started
+                self.load_stats = {'records': records, 'source': 'stream', 'seconds': round(elapsed, 4)}
+                print(f"Loaded {records} records from {self.excel_file}")
+                print(f"Load stats: streamed Excel into {len(cube.customers)} customers x "
+                      f"{len(cube.service_types)} service types in {elapsed * 1000:.1f} ms")
+                return
+
+            with self.stage('load') as stage:
+                raw_df, source = self.read_master_table()
+                stage['rows_out'] = len(raw_df)
+                stage['source'] = source
+            self.load_frame(raw_df)
+            elapsed = time.perf_counter() - started
+            
+            self.load_stats = {'records': len(self.df), 'source': source, 'seconds': round(elapsed, 4)}
             print(f"Loaded {len(self.df)} records from {self.excel_file}")
+            served_from = {
+                'cache': 'served from cache',
+                'excel+cache': 'parsed Excel, cache written',
+                'excel': 'parsed Excel, cache not used'
+            }[source]
+            print(f"Load stats: {served_from} in {elapsed * 1000:.1f} ms")
         except Exception as e:
             raise Exception(f"Error loading Excel file: {e}")
     
-    def get_period_name(self, period_type: str, year: int, month: int = None, quarter: int = None) -> str:
+    def use_cube(self, cube: MonthCube):
+        """Serve reports from an already built cube, without the master frame"""
+        self._load_pending = False
+        self.cube = cube
+        self.engine = cube
+        self.data_version += 1
+        self._report_cache.clear()
+    
+    def use_engine(self, engine: SQLiteReportEngine):
+        """Serve reports from a SQL pushdown engine instead of the in-memory cube"""
+        self._load_pending = False
+        with self._report_cache_lock:
+            self.df = None
+            self.cube = None
+            self.engine = engine
+            self.load_stats = {'records': engine.records, 'source': 'sqlite', 'seconds': 0.0}
+            self.data_version += 1
+            self._report_cache.clear()
+    
+    def reloaded(self) -> 'ProceedETLService':
+        """Freshly loaded service reading from the same source as this one"""
+        if isinstance(self.engine, SQLiteReportEngine):
+            fresh = ProceedETLService(self.excel_file, report_cache_size=self.report_cache_size, autoload=False)
+            fresh.use_engine(self.engine.reopen())
+            return fresh
+        fresh = ProceedETLService(self.excel_file, use_cache=self.use_cache, report_cache_size=self.report_cache_size,
+                                  autoload=False, years=self.years, extra_columns=self.columns,
+                                  streaming=self.streaming)
+        # Reload eagerly so a broken workbook fails here and not on a later request
+        fresh.load_data()
+        return fresh
+    
+    def get_period_name(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                        months: int = None) -> str:
         """Generate period name for column headers"""
-        if period_type.lower() == 'month':
+        if period_type.lower() == 'trailing':
+            return f"T{months}M {MONTH_NAMES[month - 1]} {year}"
+        elif period_type.lower() == 'month':
             month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
             return f"{month_names[month-1]} {year}"
@@ -45,32 +1677,16 @@ class ProceedETLService:
     
     def filter_data_by_period(self, period_type: str, year: int, month: int = None, quarter: int = None) -> pd.DataFrame:
         """Filter data based on period type (MTD, QTD, YTD) - specific period logic"""
-        filtered_df = self.df[self.df['Year'] == year].copy()
-        
-        # Month name mapping
-        month_names = {
-            1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
-            7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
-        }
+        filtered_df = self.df[self.df['Year'] == year]
         
-        if period_type.lower() == 'month':
-            # Month-to-Date: ONLY the specific month
-            target_month_name = month_names[month]
-            filtered_df = filtered_df[filtered_df['Month'] == target_month_name]
-        elif period_type.lower() == 'quarter':
-            # Quarter-to-Date: ONLY the months within that specific quarter
-            quarter_months = {
-                1: ['Jan', 'Feb', 'Mar'],
-                2: ['Apr', 'May', 'Jun'], 
-                3: ['Jul', 'Aug', 'Sep'],
-                4: ['Oct', 'Nov', 'Dec']
-            }
-            filtered_df = filtered_df[filtered_df['Month'].isin(quarter_months[quarter])]
-        elif period_type.lower() == 'year':
-            # Year-to-Date: all months in the year
-            pass  # Already filtered by year
+        if period_type.lower() in ('month', 'quarter'):
+            # MTD: ONLY the specific month, QTD: ONLY the months within that quarter
+            first_month, last_month = period_month_range(period_type, month, quarter)
+            month_num = filtered_df['Month_Num']
+            filtered_df = filtered_df[(month_num >= first_month) & (month_num <= last_month)]
+        # Year-to-Date: all months in the year, already filtered by year
         
-        return filtered_df
+        return filtered_df.copy()
     
     def calculate_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
         """Calculate aggregated metrics for the filtered period"""
@@ -98,135 +1714,621 @@ class ProceedETLService:
             'collection_rate_pct': round(collection_rate_pct, 2)
         }
     
+    def group_index(self) -> GroupIndex:
+        """Sorted group index of the current master rows, rebuilt after every load"""
+        with self._group_index_lock:
+            if self._group_index is None or self._group_index[0] != self.data_version:
+                if self.df is None:
+                    raise ValueError("point queries need the master rows, which are not loaded with the SQL engine "
+                                     "or --stream")
+                with self.stage('group index', rows_in=len(self.df)) as stage:
+                    index = GroupIndex(self.df)
+                    stage['rows_out'] = len(index.offsets)
+                self._group_index = (self.data_version, index)
+            return self._group_index[1]
+    
     def find_last_revenue_month(self, customer: str, service_type: str, year: int) -> str:
         """Find the last month with revenue > 0 for a customer/service combination"""
-        customer_data = self.df[
-            (self.df['Customer'] == customer) & 
-            (self.df['Service_Type'] == service_type) & 
-            (self.df['Year'] == year)
-        ].copy()
-        
-        # Filter months with revenue > 0
-        revenue_months = customer_data[customer_data['Revenue'] > 0].copy()
+        last_month_num = self.group_index().last_revenue_month(customer, service_type, year)
         
-        if revenue_months.empty:
+        if last_month_num == 0:
             return None
         
-        # Month order for proper sorting
-        month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        
-        # Sort by month order and get the last one
-        revenue_months.loc[:, 'month_index'] = revenue_months['Month'].map({month: idx for idx, month in enumerate(month_order)})
-        last_month_idx = revenue_months['month_index'].max()
-        
-        return month_order[last_month_idx]
+        return MONTH_NAMES[last_month_num - 1]
     
     def filter_data_ytd_smart(self, year: int, customer: str, service_type: str) -> pd.DataFrame:
         """Filter YTD data up to last month with revenue for specific customer/service"""
+        group = self.df.iloc[self.group_index().group_rows(customer, service_type, year)]
+        
         # Find last month with revenue for this customer/service
         last_revenue_month = self.find_last_revenue_month(customer, service_type, year)
         
         if last_revenue_month is None:
             # No revenue found, return all data for the customer/service
-            return self.df[
-                (self.df['Customer'] == customer) & 
-                (self.df['Service_Type'] == service_type) & 
-                (self.df['Year'] == year)
-            ].copy()
-        
-        # Get months up to and including the last revenue month
-        month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        last_month_index = month_order.index(last_revenue_month)
-        months_to_include = month_order[:last_month_index + 1]
-        
-        # Filter data
-        filtered_data = self.df[
-            (self.df['Customer'] == customer) & 
-            (self.df['Service_Type'] == service_type) & 
-            (self.df['Year'] == year) &
-            (self.df['Month'].isin(months_to_include))
-        ].copy()
-        
-        return filtered_data
-
-    def generate_report(self, period_type: str, year: int, month: int = None, quarter: int = None) -> List[Dict[str, Any]]:
-        """Generate report for specified period"""
+            return group.copy()
         
-        # Get period name for column headers
-        period_name = self.get_period_name(period_type, year, month, quarter)
+        # Months up to and including the last revenue month
+        month_num = group['Month_Num'].to_numpy()
+        last_month_num = MONTH_INDEX[last_revenue_month] + 1
+        return group[(month_num >= 1) & (month_num <= last_month_num)].copy()
+    
+    def group_metrics(self, customer: str, service_type: str, year: int, month: int = 12,
+                      quarter: int = 4) -> Dict[str, Optional[Dict[str, Any]]]:
+        """MTD, QTD and smart YTD metrics of one customer/service group
+        
+        A point query for drill-downs: the group is found in the sorted group
+        index and only its rows are summed, so the cost does not grow with the
+        size of the master table. Each of 'mtd', 'qtd' and 'ytd' holds the
+        period name and the REPORT_METRICS the matching report has for the
+        group, or None when the group has no rows in that period.
+        """
+        index = self.group_index()
         
-        # Group by Customer and Service_Type
-        report_data = []
+        # Summed in load order like MonthCube.range_totals and ytd_smart_totals, so values match the reports
+        last_revenue_month = index.last_revenue_month(customer, service_type, year)
+        year_totals = index.window_totals(customer, service_type, year, 1, last_revenue_month or 12)
+        year_totals[-1] = index.window_totals(customer, service_type, year, 1, 12)[-1]
+        totals = np.stack([index.window_totals(customer, service_type, year, month, month),
+                           index.window_totals(customer, service_type, year,
+                                               *period_month_range('quarter', quarter=quarter)),
+                           year_totals])
         
+        cost, target, revenue, collected, rows = totals.T
+        metrics = {
+            'cost': np.round(cost, 2),
+            'target': np.round(target, 2),
+            'revenue': np.round(revenue, 2),
+            'receivables_collected': np.round(collected, 2),
+            'achievement_pct': np.round(safe_divide(revenue, target) * 100, 2),
+            'gross_profit_pct': np.round(safe_divide(revenue - cost, revenue) * 100, 2),
+            'collection_rate_pct': np.round(safe_divide(collected, revenue) * 100, 2)
+        }
+        periods = [('mtd', 'month'), ('qtd', 'quarter'), ('ytd', 'year')]
+        result = {'customer': customer, 'service_type': service_type, 'year': year}
+        for position, (period, period_type) in enumerate(periods):
+            if rows[position] <= 0:
+                result[period] = None
+                continue
+            result[period] = {'period_name': self.get_period_name(period_type, year, month, quarter)}
+            result[period].update({metric: values[position].item() for metric, values in metrics.items()})
+        return result
+
+    def ytd_smart_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Row mask keeping each customer/service group up to its last revenue month.
+
+        Vectorized equivalent of calling filter_data_ytd_smart for every group:
+        the cutoff is computed with a single grouped transform instead of
+        rescanning self.df per customer/service combination.
+        """
+        month_num = df['Month_Num'].where(df['Month_Num'] > 0)
+        revenue_month_num = month_num.where(df['Revenue'] > 0)
+        last_revenue_month_num = revenue_month_num.groupby(
+            [df['Customer'], df['Service_Type']], observed=True
+        ).transform('max')
+
+        # Groups without any revenue keep all of their rows
+        return last_revenue_month_num.isna() | (month_num <= last_revenue_month_num)
+
+    def period_rows(self, period_type: str, year: int, month: int = None, quarter: int = None) -> pd.DataFrame:
+        """Master rows counted in a MTD, QTD or smart YTD report, with every column of the sheet"""
+        df = self.df[(self.df['Year'] == year) & (self.df['Month_Num'] > 0)]
         if period_type.lower() == 'year':
-            # Special handling for YTD - aggregate up to last revenue month for each customer/service
-            year_df = self.df[self.df['Year'] == year].copy()
+            return df[self.ytd_smart_mask(df)]
+        first_month, last_month = period_month_range(period_type, month, quarter)
+        return df[(df['Month_Num'] >= first_month) & (df['Month_Num'] <= last_month)]
+    
+    def rollup(self, dimensions: List[str], grouping_sets: List[Tuple[str, ...]] = None, period_type: str = 'year',
+               year: int = None, month: int = None, quarter: int = None) -> pd.DataFrame:
+        """Subtotals of a period for every grouping set over any dimension columns
+        
+        dimensions can be any columns of the master sheet (Customer,
+        Service_Type, or added ones such as a region). grouping_sets lists the
+        subtotal levels as tuples of those columns, e.g. from
+        cube_grouping_sets; the default is rollup_grouping_sets(dimensions).
+        The rows are grouped once by all dimensions in a sorted pass and every
+        level is summed from that finest level. Columns aggregated away are
+        None and grouping_id has a bit set for each of them, like SQL
+        GROUPING_ID. Metrics and derived percentages are rounded as in reports.
+        """
+        if self.df is None:
+            raise ValueError("rollup needs the master rows, which are not loaded with the SQL engine or --stream")
+        dimensions = list(dimensions)
+        missing = [dimension for dimension in dimensions if dimension not in self.df.columns]
+        if missing:
+            raise ValueError(f"Unknown dimension columns: {', '.join(missing)}")
+        if grouping_sets is None:
+            grouping_sets = rollup_grouping_sets(dimensions)
+        for grouping_set in grouping_sets:
+            if not set(grouping_set) <= set(dimensions):
+                raise ValueError(f"Grouping set {tuple(grouping_set)} is not a subset of {tuple(dimensions)}")
+        year = year if year is not None else int(self.df['Year'].max())
+        
+        rows = self.period_rows(period_type, year, month, quarter)
+        # The only pass over the rows; coarser levels are sums of this finest level
+        finest = rows.groupby(dimensions, sort=True, observed=True, dropna=False)[METRIC_COLUMNS].sum().reset_index()
+        # Missing dimension values form their own group, shown as None like aggregated-away columns
+        finest[dimensions] = finest[dimensions].astype(object).where(finest[dimensions].notna(), None)
+        
+        levels = []
+        for grouping_set in grouping_sets:
+            kept = [dimension for dimension in dimensions if dimension in grouping_set]
+            if len(kept) == len(dimensions):
+                level = finest.copy()
+            elif kept:
+                level = finest.groupby(kept, sort=True, dropna=False)[METRIC_COLUMNS].sum().reset_index()
+            else:
+                level = finest[METRIC_COLUMNS].sum().to_frame().T
+            for dimension in dimensions:
+                if dimension not in grouping_set:
+                    level[dimension] = None
+            level['grouping_id'] = sum(
+                1 << (len(dimensions) - 1 - position)
+                for position, dimension in enumerate(dimensions) if dimension not in grouping_set
+            )
+            levels.append(level[dimensions + ['grouping_id'] + METRIC_COLUMNS])
+        
+        totals = pd.concat(levels, ignore_index=True)
+        derived = self.calculate_derived_metrics_vectorized(totals)
+        cost = totals['Cost'].to_numpy(dtype=float)
+        revenue = totals['Revenue'].to_numpy(dtype=float)
+        return pd.DataFrame({
+            **{dimension: totals[dimension] for dimension in dimensions},
+            'grouping_id': totals['grouping_id'].astype(int),
+            'cost': totals['Cost'].astype(float).round(2),
+            'target': totals['Target'].astype(float).round(2),
+            'revenue': totals['Revenue'].astype(float).round(2),
+            'receivables_collected': totals['Receivables Collected'].astype(float).round(2),
+            'gross_profit': np.round(revenue - cost, 2),
+            'achievement_pct': derived['achievement_pct'],
+            'gross_profit_pct': derived['gross_profit_pct'],
+            'collection_rate_pct': derived['collection_rate_pct']
+        })
+    
+    def calculate_derived_metrics_vectorized(self, totals: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized calculate_derived_metrics over a frame of group totals"""
+        cost = totals['Cost'].to_numpy(dtype=float)
+        target = totals['Target'].to_numpy(dtype=float)
+        revenue = totals['Revenue'].to_numpy(dtype=float)
+        collected = totals['Receivables Collected'].to_numpy(dtype=float)
+
+        return pd.DataFrame({
+            'achievement_pct': np.round(safe_divide(revenue, target) * 100, 2),
+            'gross_profit_pct': np.round(safe_divide(revenue - cost, revenue) * 100, 2),
+            'collection_rate_pct': np.round(safe_divide(collected, revenue) * 100, 2)
+        }, index=totals.index)
+
+    def _build_report_frame(self, totals: pd.DataFrame) -> pd.DataFrame:
+        """Turn a frame of group totals into the fixed report columns"""
+        derived = self.calculate_derived_metrics_vectorized(totals)
+        return pd.DataFrame({
+            'Customer': totals['Customer'],
+            'Service_Type': totals['Service_Type'],
+            'cost': totals['Cost'].round(2),
+            'target': totals['Target'].round(2),
+            'revenue': totals['Revenue'].round(2),
+            'receivables_collected': totals['Receivables Collected'].round(2),
+            'achievement_pct': derived['achievement_pct'],
+            'gross_profit_pct': derived['gross_profit_pct'],
+            'collection_rate_pct': derived['collection_rate_pct']
+        })
+
+    def report_cache_key(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                         months: int = None) -> Tuple:
+        """Cache key for a report; arguments that do not affect the period are dropped"""
+        period_type = period_type.lower()
+        return (
+            period_type,
+            year,
+            month if period_type in ('month', 'trailing') else None,
+            quarter if period_type == 'quarter' else None,
+            months if period_type == 'trailing' else None,
+            self.data_version
+        )
+    
+    def report_cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters and occupancy of the report cache"""
+        return {
+            'hits': self.report_cache_hits,
+            'misses': self.report_cache_misses,
+            'size': len(self._report_cache),
+            'maxsize': self.report_cache_size,
+            'data_version': self.data_version
+        }
+    
+    def clear_report_cache(self):
+        """Drop all memoized reports, e.g. to time report generation from scratch"""
+        with self._report_cache_lock:
+            self._report_cache.clear()
+    
+    def build_report(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                     months: int = None) -> PeriodReport:
+        """Build the columnar report for specified period
+        
+        period_type 'trailing' is the window of the given number of months
+        ending at month of year, e.g. months=12 for trailing twelve months.
+        """
+        if period_type.lower() == 'trailing':
+            # Validate before the name and cache key are derived from the window
+            trailing_month_range(year, month, months)
+        key = self.report_cache_key(period_type, year, month, quarter, months)
+        with self._report_cache_lock:
+            report = self._report_cache.get(key)
+            if report is not None:
+                self.report_cache_hits += 1
+                self._report_cache.move_to_end(key)
+                return report
+            self.report_cache_misses += 1
+        
+        # Get period name for column headers
+        period_name = self.get_period_name(period_type, year, month, quarter, months)
+        
+        with self.stage(f"report {period_name} ({period_type.lower()})",
+                        rows_in=len(self.df) if self.df is not None else None) as stage:
+            # Group totals come from the pre-aggregated month cube or the SQL engine
+            totals = self.engine.period_totals(period_type, year, month, quarter, months)
+            report = PeriodReport(period_type, year, period_name, self._build_report_frame(totals),
+                                  month=month, quarter=quarter, months=months)
+            stage['rows_out'] = len(report)
+        
+        with self._report_cache_lock:
+            self._report_cache[key] = report
+            # Evict least recently used reports beyond the size bound
+            while len(self._report_cache) > self.report_cache_size:
+                self._report_cache.popitem(last=False)
+        
+        return report
+    
+    def generate_report(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                        months: int = None) -> List[Dict[str, Any]]:
+        """Generate report for specified period in the legacy list-of-dicts format"""
+        return self.build_report(period_type, year, month, quarter, months).to_records()
+    
+    def compare_periods(self, period_type: str, year: int, month: int = None, quarter: int = None,
+                        months: int = None, basis: str = 'previous') -> PeriodComparison:
+        """Compare a period with the one before it (MoM, QoQ) or a year earlier (YoY)
+        
+        The group totals of both periods come straight from the engine and
+        are aligned on a Customer/Service_Type index in one outer join; every
+        change is then computed column-wise, without building either report.
+        See comparison_period for the bases.
+        """
+        if period_type.lower() == 'trailing':
+            trailing_month_range(year, month, months)
+        previous_year, previous_month, previous_quarter = comparison_period(
+            period_type, year, month, quarter, months, basis)
+        period_name = self.get_period_name(period_type, year, month, quarter, months)
+        previous_name = self.get_period_name(period_type, previous_year, previous_month, previous_quarter, months)
+        
+        with self.stage(f"compare {period_name} vs {previous_name}",
+                        rows_in=len(self.df) if self.df is not None else None) as stage:
+            keys = ['Customer', 'Service_Type']
+            current = self.engine.period_totals(period_type, year, month, quarter, months).set_index(keys)
+            previous = self.engine.period_totals(
+                period_type, previous_year, previous_month, previous_quarter, months).set_index(keys)
+            aligned = pd.concat({'current': current, 'previous': previous}, axis=1, join='outer').sort_index()
             
-            for (customer, service_type), group in year_df.groupby(['Customer', 'Service_Type']):
-                # Get YTD data up to last revenue month for this specific customer/service
-                filtered_group = self.filter_data_ytd_smart(year, customer, service_type)
-                
-                # Calculate metrics for this customer/service combination
-                metrics = self.calculate_metrics(filtered_group)
-                derived_metrics = self.calculate_derived_metrics(metrics)
-                
-                # Create report entry with dynamic column names
-                report_entry = {
-                    "Customer": customer,
-                    "Service_Type": service_type,
-                    f"{period_name} Cost": round(metrics['cost'], 2),
-                    f"{period_name} Target": round(metrics['target'], 2),
-                    f"{period_name} Revenue": round(metrics['revenue'], 2),
-                    f"{period_name} Receivables Collected": round(metrics['receivables_collected'], 2),
-                    f"{period_name} Ach. %": derived_metrics['achievement_pct'],
-                    f"{period_name} Gross Profit %": derived_metrics['gross_profit_pct'],
-                    f"{period_name} Receivables Collected Rate %": derived_metrics['collection_rate_pct']
+            in_current = aligned[('current', 'Revenue')].notna().to_numpy()
+            in_previous = aligned[('previous', 'Revenue')].notna().to_numpy()
+            aligned = aligned.fillna(0.0)
+            
+            def compared_metrics(side: str) -> Dict[str, np.ndarray]:
+                cost = aligned[(side, 'Cost')].to_numpy(dtype=float)
+                target = aligned[(side, 'Target')].to_numpy(dtype=float)
+                revenue = aligned[(side, 'Revenue')].to_numpy(dtype=float)
+                return {
+                    'revenue': np.round(revenue, 2),
+                    'target': np.round(target, 2),
+                    'cost': np.round(cost, 2),
+                    'gross_profit': np.round(revenue - cost, 2),
+                    'achievement_pct': np.round(safe_divide(revenue, target) * 100, 2)
                 }
-                
-                report_data.append(report_entry)
-        else:
-            # Standard handling for MTD and QTD
-            filtered_df = self.filter_data_by_period(period_type, year, month, quarter)
             
-            for (customer, service_type), group in filtered_df.groupby(['Customer', 'Service_Type']):
-                # Calculate metrics for this customer/service combination
-                metrics = self.calculate_metrics(group)
-                derived_metrics = self.calculate_derived_metrics(metrics)
-                
-                # Create report entry with dynamic column names
-                report_entry = {
-                    "Customer": customer,
-                    "Service_Type": service_type,
-                    f"{period_name} Cost": round(metrics['cost'], 2),
-                    f"{period_name} Target": round(metrics['target'], 2),
-                    f"{period_name} Revenue": round(metrics['revenue'], 2),
-                    f"{period_name} Receivables Collected": round(metrics['receivables_collected'], 2),
-                    f"{period_name} Ach. %": derived_metrics['achievement_pct'],
-                    f"{period_name} Gross Profit %": derived_metrics['gross_profit_pct'],
-                    f"{period_name} Receivables Collected Rate %": derived_metrics['collection_rate_pct']
+            now, before = compared_metrics('current'), compared_metrics('previous')
+            columns = {
+                'Customer': aligned.index.get_level_values('Customer'),
+                'Service_Type': aligned.index.get_level_values('Service_Type'),
+                'status': np.where(~in_previous, 'new', np.where(~in_current, 'lost', 'continuing'))
+            }
+            for metric in PeriodComparison.COMPARED_METRICS:
+                change = np.round(now[metric] - before[metric], 2)
+                columns[metric] = now[metric]
+                columns[f"previous_{metric}"] = before[metric]
+                columns[f"{metric}_change"] = change
+                if metric != 'achievement_pct':
+                    columns[f"{metric}_change_pct"] = np.round(safe_divide(change, np.abs(before[metric])) * 100, 2)
+            
+            comparison = PeriodComparison(period_type, year, period_name, previous_name, basis,
+                                          pd.DataFrame(columns), month=month, quarter=quarter, months=months)
+            stage['rows_out'] = len(comparison)
+        return comparison
+    
+    def export_report_to_json(self, report_data: Any, filename: str, skip_unchanged: bool = False,
+                              compact: bool = False, compress: bool = False) -> bool:
+        """Export report data (a PeriodReport or JSON-ready data) to JSON file
+        
+        Rows are encoded one at a time into a temporary file that is renamed
+        into place, so readers never see a partial file. compact drops the
+        indentation and compress gzips the output (adding .gz to filename).
+        With skip_unchanged=True an existing file with identical content is
+        left untouched, so downstream consumers do not see a new version.
+        Returns whether the file was written.
+        """
+        if compress and not filename.endswith(GZIP_SUFFIX):
+            filename += GZIP_SUFFIX
+        rows = len(report_data) if isinstance(report_data, (PeriodReport, list)) else None
+        with self.stage(f"export {filename}", rows_in=rows) as stage:
+            written = write_text_atomic(filename, iter_json(report_data, compact), compress, skip_unchanged)
+            stage['rows_out'] = rows if written else 0
+            stage['bytes'] = os.path.getsize(filename) if written else 0
+        if not written:
+            print(f"Report unchanged, kept {filename}")
+            return False
+        print(f"Report exported to {filename}")
+        return True
+    
+    def build_pivot(self, year: int, current_month: int = 12, current_quarter: int = 4) -> Dict[str, Any]:
+        """Customer/Service_Type x period matrix of every metric for one year
+        
+        Replaces the per-month MTD files with one document: rows are the
+        groups with data in the year, columns the months up to current_month
+        followed by the quarters up to current_quarter and the smart YTD, and
+        metrics maps each metric to its rows x columns matrix. Every cell
+        equals the matching MTD, QTD or YTD report value (0 where that report
+        has no row for the group). Built from one slice of the month cube.
+        """
+        cube = self.cube
+        if cube is None:
+            raise ValueError("pivot needs the month cube, which is not loaded with the SQL engine")
+        
+        columns = (MONTH_NAMES[:current_month] + [f"Q{quarter}" for quarter in range(1, current_quarter + 1)] +
+                   ['YTD'])
+        with self.stage(f"pivot {year}", rows_in=len(self.df) if self.df is not None else None) as stage:
+            position = cube._year_position(year)
+            if position is None:
+                customer_idx = service_idx = np.zeros(0, dtype=np.int64)
+                matrix = np.zeros((0, len(columns), len(MonthCube.LAYERS)))
+            else:
+                customer_idx, service_idx = np.nonzero(cube.year_totals[position, ..., -1] > 0)
+                # [group, column, layer]: single months, quarter ranges and the YTD cutoff side by side
+                matrix = np.concatenate([
+                    cube.monthly[position, customer_idx, service_idx, :current_month],
+                    np.stack([
+                        cube.range_totals(year, 3 * quarter - 2, 3 * quarter)[customer_idx, service_idx]
+                        for quarter in range(1, current_quarter + 1)
+                    ], axis=1),
+                    cube.ytd_smart_totals(year)[customer_idx, service_idx][:, None]
+                ], axis=1)
+            matrix = np.round(matrix, 2)
+            
+            pivot = {
+                'format': PIVOT_FORMAT_VERSION,
+                'year': year,
+                'columns': columns,
+                'rows': [[str(customer), str(service_type)] for customer, service_type in
+                         zip(cube.customers[customer_idx], cube.service_types[service_idx])],
+                'metrics': {
+                    metric: matrix[:, :, layer].tolist()
+                    for layer, metric in enumerate(['cost', 'target', 'revenue', 'receivables_collected'])
                 }
+            }
+            stage['rows_out'] = len(customer_idx)
+        return pivot
+    
+    def export_pivot(self, pivot: Dict[str, Any], filename: str, skip_unchanged: bool = False,
+                     compress: bool = False) -> bool:
+        """Write a build_pivot document as one compact JSON file, like export_report_to_json"""
+        if compress and not filename.endswith(GZIP_SUFFIX):
+            filename += GZIP_SUFFIX
+        encoder = json.JSONEncoder(separators=JSON_COMPACT_SEPARATORS)
+        with self.stage(f"export {filename}", rows_in=len(pivot['rows'])) as stage:
+            written = write_text_atomic(filename, [encoder.encode(pivot)], compress, skip_unchanged)
+            stage['rows_out'] = len(pivot['rows']) if written else 0
+            stage['bytes'] = os.path.getsize(filename) if written else 0
+        if not written:
+            print(f"Pivot unchanged, kept {filename}")
+            return False
+        print(f"Pivot of {len(pivot['rows'])} groups x {len(pivot['columns'])} periods exported to {filename}")
+        return True
+    
+    def export_reports_bundle(self, reports: Dict[str, Any], filename: str, skip_unchanged: bool = False,
+                              compress: bool = False) -> bool:
+        """Export all reports of a run to one compact JSON file with an index
+        
+        The file is {"format", "index", "reports"}: index lists each report's
+        name, row count and period (for PeriodReports) in output order, and
+        reports maps the names to their rows. Written like export_report_to_json.
+        """
+        index = []
+        for name, report_data in reports.items():
+            entry = {'name': name, 'records': len(report_data) if isinstance(report_data, (PeriodReport, list)) else None}
+            if isinstance(report_data, PeriodReport):
+                entry.update(period_type=report_data.period_type, year=report_data.year, month=report_data.month,
+                             quarter=report_data.quarter, period_name=report_data.period_name)
+                if report_data.months is not None:
+                    entry['months'] = report_data.months
+                if isinstance(report_data, PeriodComparison):
+                    entry.update(previous_period_name=report_data.previous_name, basis=report_data.basis)
+            index.append(entry)
+        
+        encoder = json.JSONEncoder(separators=JSON_COMPACT_SEPARATORS)
+        
+        def chunks() -> Iterator[str]:
+            yield f'{{"format":{BUNDLE_FORMAT_VERSION},"index":{encoder.encode(index)},"reports":{{'
+            for position, (name, report_data) in enumerate(reports.items()):
+                yield (',' if position else '') + encoder.encode(name) + ':'
+                yield from iter_json(report_data, compact=True)
+            yield '}}'
+        
+        if compress and not filename.endswith(GZIP_SUFFIX):
+            filename += GZIP_SUFFIX
+        with self.stage(f"export {filename}", rows_in=len(reports)) as stage:
+            written = write_text_atomic(filename, chunks(), compress, skip_unchanged)
+            stage['rows_out'] = len(reports) if written else 0
+            stage['bytes'] = os.path.getsize(filename) if written else 0
+        if not written:
+            print(f"Bundle unchanged, kept {filename}")
+            return False
+        print(f"{len(reports)} reports bundled into {filename}")
+        return True
+    
+    def export_to_sqlite(self, database_file: str, table: str = REVENUE_TABLE, prune: bool = False) -> Dict[str, Any]:
+        """Bulk-upsert the normalized master rows into a SQLite revenue table
+        
+        The table is created with the dashboard schema if it is missing, and
+        the columns the dashboard migrations add are added to older tables.
+        Rows carry the same columns as a dashboard upload: original_cost and
+        original_target hold the workbook's cost and target, and days the
+        calendar days of the month, the upload's default when the sheet has
+        no Days column. All rows go through one prepared upsert with
+        executemany inside a single transaction, with journaling relaxed for
+        the duration of the load.
+        Like the dashboard's own uploads, rows that are not in the workbook
+        are left alone. With prune=True the same transaction deletes rows of
+        the years just loaded (the years given to the service, or else the
+        years with rows in the workbook) that are no longer in the workbook.
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        
+        started = time.perf_counter()
+        with self.stage(f"export {database_file}:{table}", rows_in=len(self.df) if self.df is not None else None) as stage:
+            records = self.cube.month_records()
+            
+            connection = sqlite3.connect(database_file)
+            try:
+                # Connection-scoped tuning for one large write transaction
+                connection.execute("PRAGMA synchronous = NORMAL")
+                connection.execute("PRAGMA temp_store = MEMORY")
+                connection.execute("PRAGMA cache_size = -65536")
+                connection.executescript(REVENUE_TABLE_SCHEMA.format(table=table))
+                columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                for column, definition in REVENUE_MIGRATED_COLUMNS:
+                    if column not in columns:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
                 
-                report_data.append(report_entry)
+                prune_years = (self.years or sorted({record[2] for record in records})) if prune else []
+                if prune_years:
+                    connection.executescript(REVENUE_KEYS_SCHEMA)
+                
+                removed = 0
+                with connection:
+                    connection.executemany(REVENUE_UPSERT.format(table=table), [
+                        record + (calendar.monthrange(record[2], MONTH_INDEX[record[3]] + 1)[1], record[4], record[5])
+                        for record in records
+                    ])
+                    if prune_years:
+                        connection.executemany("INSERT INTO temp.revenue_keys VALUES (?, ?, ?, ?)",
+                                               [record[:4] for record in records])
+                        year_filter = f"year IN ({', '.join('?' * len(prune_years))}) AND "
+                        removed = connection.execute(REVENUE_PRUNE.format(table=table, year_filter=year_filter),
+                                                     prune_years).rowcount
+            finally:
+                connection.close()
+            stage['rows_out'] = len(records)
         
-        return report_data
+        elapsed = time.perf_counter() - started
+        print(f"Upserted {len(records)} rows into {database_file}:{table}"
+              f"{f' and removed {removed} stale rows' if prune else ''} in {elapsed * 1000:.1f} ms")
+        return {'rows': len(records), 'removed': removed, 'table': table, 'seconds': round(elapsed, 4)}
     
-    def export_report_to_json(self, report_data: List[Dict[str, Any]], filename: str):
-        """Export report data to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(report_data, f, indent=2)
-        print(f"Report exported to {filename}")
+    def _rollup_rows(self, totals: pd.DataFrame) -> List[List[float]]:
+        """cost, target, revenue, receivables, achievement %, gross profit, gross profit % per row of totals"""
+        cost = totals['cost'].to_numpy(dtype=float)
+        target = totals['target'].to_numpy(dtype=float)
+        revenue = totals['revenue'].to_numpy(dtype=float)
+        gross_profit = revenue - cost
+        return np.column_stack([
+            np.round(cost, 2),
+            np.round(target, 2),
+            np.round(revenue, 2),
+            np.round(totals['receivables_collected'].to_numpy(dtype=float), 2),
+            np.round(safe_divide(revenue, target) * 100, 2),
+            np.round(gross_profit, 2),
+            np.round(safe_divide(gross_profit, revenue) * 100, 2)
+        ]).tolist()
     
-    def generate_slide1_landing_achievement(self, year: int) -> Dict[str, Any]:
+    def materialize_aggregates(self, database_file: str, years: List[int] = None) -> Dict[str, Any]:
+        """Maintain MTD/QTD/YTD summary tables in a SQLite file for primary-key reads
+        
+        Writes per period x customer x service type, per service type and
+        company totals for every month, quarter and YTD of the given years
+        (default: all loaded years). Each period's report is fingerprinted
+        and only periods whose fingerprint changed since the last refresh are
+        deleted and rewritten, all in one transaction.
+        """
+        started = time.perf_counter()
+        years = [int(year) for year in self.cube.years] if years is None else years
+        metric_columns = ['cost', 'target', 'revenue', 'receivables_collected']
+        
+        connection = sqlite3.connect(database_file)
+        refreshed = skipped = 0
+        try:
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA temp_store = MEMORY")
+            connection.executescript(SUMMARY_TABLES_SCHEMA)
+            stored = {
+                (period_type, year, period): fingerprint
+                for period_type, year, period, fingerprint in connection.execute(
+                    "SELECT period_type, year, period, fingerprint FROM etl_summary_state")
+            }
+            
+            with connection:
+                for year in years:
+                    for _, period_type, month, quarter in self.report_periods(year):
+                        report = self.build_report(period_type, year, month=month, quarter=quarter)
+                        period = month or quarter or 0
+                        key = (period_type, year, period)
+                        
+                        frame = report.frame
+                        fingerprint = hashlib.blake2b(
+                            pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes(), digest_size=16
+                        ).hexdigest()
+                        if stored.get(key) == fingerprint:
+                            skipped += 1
+                            continue
+                        
+                        for table in ('etl_period_summary', 'etl_service_type_summary', 'etl_company_summary'):
+                            connection.execute(
+                                f"DELETE FROM {table} WHERE period_type = ? AND year = ? AND period = ?", key)
+                        
+                        prefix = [period_type, year, period]
+                        connection.executemany(
+                            "INSERT INTO etl_period_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [prefix + [customer, service_type, report.period_name] + metrics
+                             for customer, service_type, *metrics in frame[PeriodReport.REPORT_COLUMNS].itertuples(index=False)]
+                        )
+                        
+                        by_service = frame.groupby('Service_Type', sort=False)[metric_columns].sum()
+                        connection.executemany(
+                            "INSERT INTO etl_service_type_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [prefix + [service_type, report.period_name] + metrics
+                             for service_type, metrics in zip(by_service.index, self._rollup_rows(by_service))]
+                        )
+                        
+                        if len(frame):
+                            company = frame[metric_columns].sum().to_frame().T
+                            connection.execute(
+                                "INSERT INTO etl_company_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                prefix + [report.period_name] + self._rollup_rows(company)[0]
+                            )
+                        
+                        connection.execute(
+                            "INSERT OR REPLACE INTO etl_summary_state (period_type, year, period, fingerprint) "
+                            "VALUES (?, ?, ?, ?)", key + (fingerprint,))
+                        refreshed += 1
+        finally:
+            connection.close()
+        
+        elapsed = time.perf_counter() - started
+        print(f"Summary tables: {refreshed} periods refreshed, {skipped} unchanged in {elapsed * 1000:.1f} ms")
+        return {'refreshed': refreshed, 'unchanged': skipped, 'seconds': round(elapsed, 4)}
+    
+    def generate_slide1_landing_achievement(self, year: int,
+                                            intermediates: 'SlideIntermediates' = None) -> Dict[str, Any]:
         """Slide 1: Total Landing Achievement - Total achievement vs total target"""
-        # Get YTD data for all customers
-        ytd_report = self.generate_report('year', year)
-        
-        total_metrics = {
-            'cost': sum(item[f'{year} Cost'] for item in ytd_report),
-            'target': sum(item[f'{year} Target'] for item in ytd_report),
-            'revenue': sum(item[f'{year} Revenue'] for item in ytd_report),
-            'receivables_collected': sum(item[f'{year} Receivables Collected'] for item in ytd_report)
-        }
+        intermediates = intermediates or SlideIntermediates(self, year)
+        # Company YTD totals over all customers
+        total_metrics = intermediates.company_totals('ytd')
         
         # Calculate achievement and other metrics
         achievement_pct = (total_metrics['revenue'] / total_metrics['target'] * 100) if total_metrics['target'] > 0 else 0
@@ -234,113 +2336,71 @@ class ProceedETLService:
         gross_profit_pct = (gross_profit / total_metrics['revenue'] * 100) if total_metrics['revenue'] > 0 else 0
         
         return {
-            "Total Target": round(total_metrics['target'], 2),
-            "Total Revenue": round(total_metrics['revenue'], 2),
-            "Total Cost": round(total_metrics['cost'], 2),
-            "Total Achievement %": round(achievement_pct, 2),
-            "Total Gross Profit": round(gross_profit, 2),
-            "Total Gross Profit %": round(gross_profit_pct, 2),
-            "Year": year
+            "Total Target": round(float(total_metrics['target']), 2),
+            "Total Revenue": round(float(total_metrics['revenue']), 2),
+            "Total Cost": round(float(total_metrics['cost']), 2),
+            "Total Achievement %": round(float(achievement_pct), 2),
+            "Total Gross Profit": round(float(gross_profit), 2),
+            "Total Gross Profit %": round(float(gross_profit_pct), 2),
+            "Year": year,
+            **(self._summarize_forecast(intermediates.forecast_totals(), intermediates.current_month, year)
+               if intermediates.forecast else {})
         }
     
-    def generate_slide2_business_unit_landing(self, year: int) -> List[Dict[str, Any]]:
+    def generate_slide2_business_unit_landing(self, year: int,
+                                              intermediates: 'SlideIntermediates' = None) -> List[Dict[str, Any]]:
         """Slide 2: Business Unit Landing - High level achievement by service type"""
-        # Get YTD data
-        ytd_report = self.generate_report('year', year)
-        
-        # Group by service type
-        service_groups = {}
-        for item in ytd_report:
-            service_type = item['Service_Type']
-            if service_type not in service_groups:
-                service_groups[service_type] = {
-                    'cost': 0,
-                    'target': 0,
-                    'revenue': 0,
-                    'receivables_collected': 0
-                }
-            
-            service_groups[service_type]['cost'] += item[f'{year} Cost']
-            service_groups[service_type]['target'] += item[f'{year} Target']
-            service_groups[service_type]['revenue'] += item[f'{year} Revenue']
-            service_groups[service_type]['receivables_collected'] += item[f'{year} Receivables Collected']
+        intermediates = intermediates or SlideIntermediates(self, year)
+        # YTD totals by service type, in order of first appearance
+        service_groups = intermediates.service_type_totals('ytd')
         
         # Calculate metrics for each service type
         result = []
-        for service_type, metrics in service_groups.items():
-            achievement_pct = (metrics['revenue'] / metrics['target'] * 100) if metrics['target'] > 0 else 0
-            gross_profit = metrics['revenue'] - metrics['cost']
-            gross_profit_pct = (gross_profit / metrics['revenue'] * 100) if metrics['revenue'] > 0 else 0
-            
-            result.append({
-                "Service_Type": service_type,
-                "Target": round(metrics['target'], 2),
-                "Revenue": round(metrics['revenue'], 2),
-                "Cost": round(metrics['cost'], 2),
-                "Achievement %": round(achievement_pct, 2),
-                "Gross Profit": round(gross_profit, 2),
-                "Gross Profit %": round(gross_profit_pct, 2)
-            })
+        for service_type, metrics in service_groups.iterrows():
+            entry = {"Service_Type": service_type, **self._summarize_totals(metrics)}
+            if intermediates.forecast:
+                entry.update(self._summarize_forecast(intermediates.forecast_totals('Service_Type').loc[service_type],
+                                                      intermediates.current_month, year))
+            result.append(entry)
         
         return result
     
-    def generate_slide3_business_unit_period_breakdown(self, year: int, current_month: int = 6, current_quarter: int = 2) -> Dict[str, List[Dict[str, Any]]]:
+    def generate_slide3_business_unit_period_breakdown(self, year: int, current_month: int = 6, current_quarter: int = 2,
+                                                       intermediates: 'SlideIntermediates' = None) -> Dict[str, List[Dict[str, Any]]]:
         """Slide 3: Business Unit Period Breakdown - MTD, QTD, YTD by service type"""
+        intermediates = intermediates or SlideIntermediates(self, year, current_month, current_quarter)
         result = {
             "Transportation": [],
             "Warehouses": []
         }
         
-        # Get current periods
-        mtd_report = self.generate_report('month', year, month=current_month)
-        qtd_report = self.generate_report('quarter', year, quarter=current_quarter)
-        ytd_report = self.generate_report('year', year)
-        
-        # Period names
-        mtd_name = self.get_period_name('month', year, current_month)
-        qtd_name = self.get_period_name('quarter', year, quarter=current_quarter)
-        ytd_name = str(year)
-        
-        # Aggregate by service type for each period
+        # Service type totals of the current month, quarter and year
         for service_type in ["Transportation", "Warehouses"]:
-            # MTD
-            mtd_metrics = self._aggregate_by_service_type(mtd_report, service_type, mtd_name)
-            if mtd_metrics:
-                mtd_metrics["Period"] = f"MTD ({mtd_name})"
-                result[service_type].append(mtd_metrics)
-            
-            # QTD
-            qtd_metrics = self._aggregate_by_service_type(qtd_report, service_type, qtd_name)
-            if qtd_metrics:
-                qtd_metrics["Period"] = f"QTD ({qtd_name})"
-                result[service_type].append(qtd_metrics)
-            
-            # YTD
-            ytd_metrics = self._aggregate_by_service_type(ytd_report, service_type, ytd_name)
-            if ytd_metrics:
-                ytd_metrics["Period"] = f"YTD ({ytd_name})"
-                result[service_type].append(ytd_metrics)
+            for period, label in [('mtd', 'MTD'), ('qtd', 'QTD'), ('ytd', 'YTD')]:
+                totals = intermediates.service_type_totals(period)
+                if service_type in totals.index:
+                    metrics = self._summarize_totals(totals.loc[service_type])
+                    metrics["Period"] = f"{label} ({intermediates.report(period).period_name})"
+                    result[service_type].append(metrics)
         
         return result
     
-    def _aggregate_by_service_type(self, report: List[Dict], service_type: str, period_name: str) -> Dict[str, Any]:
-        """Helper function to aggregate metrics by service type"""
-        filtered_items = [item for item in report if item['Service_Type'] == service_type]
-        
-        if not filtered_items:
-            return None
-        
-        # Find the column names dynamically
-        cost_col = next((k for k in filtered_items[0].keys() if 'Cost' in k and period_name in k), None)
-        target_col = next((k for k in filtered_items[0].keys() if 'Target' in k and period_name in k), None)
-        revenue_col = next((k for k in filtered_items[0].keys() if 'Revenue' in k and period_name in k), None)
-        
-        if not all([cost_col, target_col, revenue_col]):
-            return None
-        
-        total_cost = sum(item[cost_col] for item in filtered_items)
-        total_target = sum(item[target_col] for item in filtered_items)
-        total_revenue = sum(item[revenue_col] for item in filtered_items)
+    def _summarize_forecast(self, totals: pd.Series, as_of: int, year: int) -> Dict[str, Any]:
+        """Full-year target and projected landing of summed forecast columns"""
+        target = float(totals['full_year_target'])
+        summary = {"Forecast As Of": self.get_period_name('month', year, as_of),
+                   "Full Year Target": round(target, 2)}
+        for column, label in [('run_rate_revenue', 'Run-Rate'), ('trend_revenue', 'Trend')]:
+            revenue = float(totals[column])
+            summary[f"Projected Revenue ({label})"] = round(revenue, 2)
+            summary[f"Projected Achievement % ({label})"] = round(revenue / target * 100, 2) if target > 0 else 0
+        return summary
+    
+    def _summarize_totals(self, totals: pd.Series) -> Dict[str, Any]:
+        """Target/revenue/cost totals with achievement and gross profit"""
+        total_cost = float(totals['cost'])
+        total_target = float(totals['target'])
+        total_revenue = float(totals['revenue'])
         
         achievement_pct = (total_revenue / total_target * 100) if total_target > 0 else 0
         gross_profit = total_revenue - total_cost
@@ -355,183 +2415,546 @@ class ProceedETLService:
             "Gross Profit %": round(gross_profit_pct, 2)
         }
     
-    def generate_slide4_customer_achievement(self, year: int, current_quarter: int = 2) -> List[Dict[str, Any]]:
-        """Slide 4: Customer Achievement - QTD and YTD by customer"""
-        qtd_report = self.generate_report('quarter', year, quarter=current_quarter)
-        ytd_report = self.generate_report('year', year)
-        
-        qtd_name = self.get_period_name('quarter', year, quarter=current_quarter)
-        ytd_name = str(year)
+    def _customer_achievement_entries(self, qtd: pd.DataFrame, ytd: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Merge per-customer QTD and YTD achievement into slide entries"""
+        columns = ['target', 'revenue', 'achievement_pct']
+        qtd_rows = dict(zip(qtd.index.tolist(), zip(*(qtd[column].tolist() for column in columns))))
+        ytd_rows = dict(zip(ytd.index.tolist(), zip(*(ytd[column].tolist() for column in columns))))
         
-        # Create customer dictionary
-        customers = {}
-        
-        # Process QTD data
-        for item in qtd_report:
-            customer = item['Customer']
-            if customer not in customers:
-                customers[customer] = {}
-            
-            # Sum up metrics for this customer
-            if 'QTD' not in customers[customer]:
-                customers[customer]['QTD'] = {
-                    'cost': 0, 'target': 0, 'revenue': 0
-                }
-            
-            customers[customer]['QTD']['cost'] += item[f'{qtd_name} Cost']
-            customers[customer]['QTD']['target'] += item[f'{qtd_name} Target']
-            customers[customer]['QTD']['revenue'] += item[f'{qtd_name} Revenue']
-        
-        # Process YTD data
-        for item in ytd_report:
-            customer = item['Customer']
-            if customer not in customers:
-                customers[customer] = {}
-            
-            if 'YTD' not in customers[customer]:
-                customers[customer]['YTD'] = {
-                    'cost': 0, 'target': 0, 'revenue': 0
-                }
-            
-            customers[customer]['YTD']['cost'] += item[f'{ytd_name} Cost']
-            customers[customer]['YTD']['target'] += item[f'{ytd_name} Target']
-            customers[customer]['YTD']['revenue'] += item[f'{ytd_name} Revenue']
+        # QTD customers first, then customers that only appear in YTD
+        customers = list(qtd_rows) + [customer for customer in ytd_rows if customer not in qtd_rows]
         
-        # Build result
         result = []
-        for customer, periods in customers.items():
+        for customer in customers:
             entry = {"Customer": customer}
             
             # QTD metrics
-            if 'QTD' in periods:
-                qtd_ach = (periods['QTD']['revenue'] / periods['QTD']['target'] * 100) if periods['QTD']['target'] > 0 else 0
-                entry[f"QTD Target"] = round(periods['QTD']['target'], 2)
-                entry[f"QTD Revenue"] = round(periods['QTD']['revenue'], 2)
-                entry[f"QTD Achievement %"] = round(qtd_ach, 2)
+            if customer in qtd_rows:
+                target, revenue, achievement_pct = qtd_rows[customer]
+                entry["QTD Target"] = round(target, 2)
+                entry["QTD Revenue"] = round(revenue, 2)
+                entry["QTD Achievement %"] = round(achievement_pct, 2)
             
             # YTD metrics
-            if 'YTD' in periods:
-                ytd_ach = (periods['YTD']['revenue'] / periods['YTD']['target'] * 100) if periods['YTD']['target'] > 0 else 0
-                entry[f"YTD Target"] = round(periods['YTD']['target'], 2)
-                entry[f"YTD Revenue"] = round(periods['YTD']['revenue'], 2)
-                entry[f"YTD Achievement %"] = round(ytd_ach, 2)
+            if customer in ytd_rows:
+                target, revenue, achievement_pct = ytd_rows[customer]
+                entry["YTD Target"] = round(target, 2)
+                entry["YTD Revenue"] = round(revenue, 2)
+                entry["YTD Achievement %"] = round(achievement_pct, 2)
             
             result.append(entry)
         
         return result
     
-    def generate_slide5_customer_by_service_type(self, year: int, current_quarter: int = 2) -> Dict[str, List[Dict[str, Any]]]:
+    def generate_slide4_customer_achievement(self, year: int, current_quarter: int = 2,
+                                             intermediates: 'SlideIntermediates' = None) -> List[Dict[str, Any]]:
+        """Slide 4: Customer Achievement - QTD and YTD by customer"""
+        intermediates = intermediates or SlideIntermediates(self, year, current_quarter=current_quarter)
+        return self._customer_achievement_entries(
+            intermediates.customer_achievement('qtd'),
+            intermediates.customer_achievement('ytd')
+        )
+    
+    def generate_slide5_customer_by_service_type(self, year: int, current_quarter: int = 2,
+                                                 intermediates: 'SlideIntermediates' = None) -> Dict[str, List[Dict[str, Any]]]:
         """Slide 5: Customer Achievement by Service Type - QTD and YTD"""
-        qtd_report = self.generate_report('quarter', year, quarter=current_quarter)
-        ytd_report = self.generate_report('year', year)
-        
-        qtd_name = self.get_period_name('quarter', year, quarter=current_quarter)
-        ytd_name = str(year)
-        
-        result = {
-            "Transportation": [],
-            "Warehouses": []
-        }
+        intermediates = intermediates or SlideIntermediates(self, year, current_quarter=current_quarter)
+        result = {}
         
         # Process by service type
         for service_type in ["Transportation", "Warehouses"]:
-            customers = {}
-            
-            # Process QTD
-            qtd_filtered = [item for item in qtd_report if item['Service_Type'] == service_type]
-            for item in qtd_filtered:
-                customer = item['Customer']
-                if customer not in customers:
-                    customers[customer] = {'QTD': {}, 'YTD': {}}
-                
-                customers[customer]['QTD'] = {
-                    'target': item[f'{qtd_name} Target'],
-                    'revenue': item[f'{qtd_name} Revenue'],
-                    'achievement': item[f'{qtd_name} Ach. %']
-                }
-            
-            # Process YTD
-            ytd_filtered = [item for item in ytd_report if item['Service_Type'] == service_type]
-            for item in ytd_filtered:
-                customer = item['Customer']
-                if customer not in customers:
-                    customers[customer] = {'QTD': {}, 'YTD': {}}
-                
-                customers[customer]['YTD'] = {
-                    'target': item[f'{ytd_name} Target'],
-                    'revenue': item[f'{ytd_name} Revenue'],
-                    'achievement': item[f'{ytd_name} Ach. %']
-                }
-            
-            # Build result for this service type
-            for customer, periods in customers.items():
-                entry = {"Customer": customer}
-                
-                if periods.get('QTD'):
-                    entry["QTD Target"] = round(periods['QTD']['target'], 2)
-                    entry["QTD Revenue"] = round(periods['QTD']['revenue'], 2)
-                    entry["QTD Achievement %"] = round(periods['QTD']['achievement'], 2)
-                
-                if periods.get('YTD'):
-                    entry["YTD Target"] = round(periods['YTD']['target'], 2)
-                    entry["YTD Revenue"] = round(periods['YTD']['revenue'], 2)
-                    entry["YTD Achievement %"] = round(periods['YTD']['achievement'], 2)
-                
-                result[service_type].append(entry)
+            result[service_type] = self._customer_achievement_entries(
+                intermediates.customer_achievement('qtd', service_type),
+                intermediates.customer_achievement('ytd', service_type)
+            )
         
         return result
     
-    def generate_presentation_slides(self, year: int, current_month: int = 6, current_quarter: int = 2):
-        """Generate all presentation slides and export to JSON files"""
+    def generate_presentation_slides(self, year: int, current_month: int = 6, current_quarter: int = 2,
+                                     skip_unchanged: bool = False, compact: bool = False, compress: bool = False,
+                                     bundle: str = None, forecast: bool = False):
+        """Generate all presentation slides and export to JSON files
+        
+        With bundle set the slides go to that single file instead of one file each.
+        forecast adds the projected full-year landing to the landing slides (1 and 2).
+        """
         print(f"\nGenerating presentation slides for {year}...")
+        slides = OrderedDict()
+        # Reports and rollups shared between the slides are computed once
+        intermediates = SlideIntermediates(self, year, current_month, current_quarter, forecast)
+        
+        def emit(name: str, label: str, build):
+            with self.stage(label) as stage:
+                slide = build()
+                # Entries of the slide: rows of a list, sections of a dict
+                stage['rows_out'] = len(slide)
+            slides[name] = slide
+            if not bundle:
+                self.export_report_to_json(slide, f"{name}.json", skip_unchanged, compact=compact, compress=compress)
+            print(f"✓ {label} generated")
         
         # Slide 1: Landing Achievement
-        slide1 = self.generate_slide1_landing_achievement(year)
-        self.export_report_to_json(slide1, "Slide1_Landing_Achievement.json")
-        print("✓ Slide 1: Landing Achievement generated")
+        emit("Slide1_Landing_Achievement", "Slide 1: Landing Achievement",
+             lambda: self.generate_slide1_landing_achievement(year, intermediates))
         
         # Slide 2: Business Unit Landing
-        slide2 = self.generate_slide2_business_unit_landing(year)
-        self.export_report_to_json(slide2, "Slide2_Business_Unit_Landing.json")
-        print("✓ Slide 2: Business Unit Landing generated")
+        emit("Slide2_Business_Unit_Landing", "Slide 2: Business Unit Landing",
+             lambda: self.generate_slide2_business_unit_landing(year, intermediates))
         
         # Slide 3: Business Unit Period Breakdown
-        slide3 = self.generate_slide3_business_unit_period_breakdown(year, current_month, current_quarter)
-        self.export_report_to_json(slide3, "Slide3_Business_Unit_Period_Breakdown.json")
-        print("✓ Slide 3: Business Unit Period Breakdown generated")
+        emit("Slide3_Business_Unit_Period_Breakdown", "Slide 3: Business Unit Period Breakdown",
+             lambda: self.generate_slide3_business_unit_period_breakdown(year, current_month, current_quarter,
+                                                                         intermediates))
         
         # Slide 4: Customer Achievement
-        slide4 = self.generate_slide4_customer_achievement(year, current_quarter)
-        self.export_report_to_json(slide4, "Slide4_Customer_Achievement.json")
-        print("✓ Slide 4: Customer Achievement generated")
+        emit("Slide4_Customer_Achievement", "Slide 4: Customer Achievement",
+             lambda: self.generate_slide4_customer_achievement(year, current_quarter, intermediates))
         
         # Slide 5: Customer by Service Type
-        slide5 = self.generate_slide5_customer_by_service_type(year, current_quarter)
-        self.export_report_to_json(slide5, "Slide5_Customer_By_Service_Type.json")
-        print("✓ Slide 5: Customer by Service Type generated")
+        emit("Slide5_Customer_By_Service_Type", "Slide 5: Customer by Service Type",
+             lambda: self.generate_slide5_customer_by_service_type(year, current_quarter, intermediates))
+        
+        if bundle:
+            self.export_reports_bundle(slides, bundle, skip_unchanged, compress=compress)
         
+        cache_info = self.report_cache_info()
+        print(f"Report cache: {cache_info['misses']} reports computed, {cache_info['hits']} served from cache")
         print("\nAll presentation slides generated successfully!")
     
-    def generate_all_reports(self, year: int, current_month: int = 12, current_quarter: int = 4):
-        """Generate monthly, quarterly, and yearly reports"""
-        reports = {}
+    def report_periods(self, year: int, current_month: int = 12, current_quarter: int = 4) -> List[Tuple[str, str, int, int]]:
+        """(report name, period type, month, quarter) for every report of generate_all_reports"""
+        periods = []
         
         # Monthly reports (MTD for each month up to current_month)
         for month in range(1, current_month + 1):
             period_name = self.get_period_name('month', year, month)
-            reports[f"MTD_{period_name.replace(' ', '_')}"] = self.generate_report('month', year, month=month)
+            periods.append((f"MTD_{period_name.replace(' ', '_')}", 'month', month, None))
         
         # Quarterly reports (QTD for each quarter up to current_quarter)
         for quarter in range(1, current_quarter + 1):
             period_name = self.get_period_name('quarter', year, quarter=quarter)
-            reports[f"QTD_{period_name.replace(' ', '_')}"] = self.generate_report('quarter', year, quarter=quarter)
+            periods.append((f"QTD_{period_name.replace(' ', '_')}", 'quarter', None, quarter))
         
         # Yearly report (YTD)
         period_name = self.get_period_name('year', year)
-        reports[f"YTD_{period_name}"] = self.generate_report('year', year)
+        periods.append((f"YTD_{period_name}", 'year', None, None))
+        
+        return periods
+    
+    def trailing_periods(self, year: int, month: int, windows: List[int] = None) -> List[Tuple[str, int]]:
+        """(report name, window length) of the trailing reports ending at month of year"""
+        return [
+            (f"T{months}M_{MONTH_NAMES[month - 1]}_{year}", months)
+            for months in (windows or TRAILING_WINDOWS)
+        ]
+    
+    def generate_trailing_reports(self, year: int, month: int, windows: List[int] = None) -> Dict[str, PeriodReport]:
+        """Trailing-window reports (T3M, T6M, T12M by default) ending at month of year"""
+        return {
+            report_name: self.build_report('trailing', year, month=month, months=months)
+            for report_name, months in self.trailing_periods(year, month, windows)
+        }
+    
+    def forecast(self, year: int, as_of: int = 12) -> pd.DataFrame:
+        """Run-rate and trend landing projections of every group, see MonthCube.landing_forecast"""
+        if self.cube is None:
+            raise ValueError("forecasting needs the month cube, which is not loaded with the SQL engine")
+        with self.stage(f"forecast {year} as of {MONTH_NAMES[as_of - 1]}",
+                        rows_in=len(self.df) if self.df is not None else None) as stage:
+            forecast = self.cube.landing_forecast(year, as_of)
+            stage['rows_out'] = len(forecast)
+        return forecast
+    
+    def build_forecast_report(self, year: int, as_of: int = 12) -> PeriodReport:
+        """YTD report with each group's full-year target and projected landing appended
         
+        Adds the projected revenue and the achievement of the full-year
+        target it implies, for both the run-rate and the trend projection.
+        """
+        report = self.build_report('year', year)
+        forecast = self.forecast(year, as_of)
+        target = forecast['full_year_target'].to_numpy(dtype=float)
+        projections = pd.DataFrame({
+            'Customer': forecast['Customer'],
+            'Service_Type': forecast['Service_Type'],
+            'full_year_target': np.round(target, 2)
+        })
+        for method in ['run_rate', 'trend']:
+            revenue = forecast[f"{method}_revenue"].to_numpy(dtype=float)
+            projections[f"{method}_revenue"] = np.round(revenue, 2)
+            projections[f"{method}_achievement_pct"] = np.round(safe_divide(revenue, target) * 100, 2)
+        
+        frame = report.frame.merge(projections, on=['Customer', 'Service_Type'], how='left')
+        return PeriodReport('year', year, report.period_name, frame)
+    
+    def generate_all_reports(self, year: int, current_month: int = 12, current_quarter: int = 4,
+                             forecast: bool = False):
+        """Generate monthly, quarterly, and yearly reports as PeriodReport objects
+        
+        With forecast the YTD report carries the landing projections as of
+        current_month, see build_forecast_report.
+        """
+        return {
+            report_name: (self.build_forecast_report(year, current_month) if forecast and period_type == 'year'
+                          else self.build_report(period_type, year, month=month, quarter=quarter))
+            for report_name, period_type, month, quarter in self.report_periods(year, current_month, current_quarter)
+        }
+    
+    def changed_months(self, year: int, previous_groups: Optional[List[List[Any]]]) -> Optional[set]:
+        """Months of a year whose data differs from a previous load's fingerprints
+        
+        Added and removed Customer/Service_Type groups count as changed in
+        every month. Returns None when there is no previous state to compare.
+        """
+        if previous_groups is None:
+            return None
+        
+        previous = {
+            (customer, service_type, group_year): digests
+            for customer, service_type, group_year, digests in previous_groups
+            if group_year == year
+        }
+        current = self.cube.group_fingerprints(year)
+        
+        changed = set()
+        for key in set(previous) | set(current):
+            old_digests = previous.get(key, [None] * 12)
+            new_digests = current.get(key, [None] * 12)
+            changed.update(month for month in range(1, 13) if old_digests[month - 1] != new_digests[month - 1])
+        return changed
+    
+    def generate_changed_reports(self, year: int, changed_months: Optional[set],
+                                 current_month: int = 12, current_quarter: int = 4,
+                                 output_dir: str = '.', suffix: str = '.json') -> Dict[str, PeriodReport]:
+        """Reports of generate_all_reports whose period contains changed months
+        
+        Reports whose output file (name + suffix) is missing from output_dir
+        are always included; changed_months=None (no previous run) includes everything.
+        """
+        reports = {}
+        for report_name, period_type, month, quarter in self.report_periods(year, current_month, current_quarter):
+            first_month, last_month = period_month_range(period_type, month, quarter)
+            affected = (
+                changed_months is None or
+                any(first_month <= changed <= last_month for changed in changed_months) or
+                not os.path.exists(os.path.join(output_dir, f"{report_name}{suffix}"))
+            )
+            if affected:
+                reports[report_name] = self.build_report(period_type, year, month=month, quarter=quarter)
         return reports
+    
+    def generate_all_reports_batch(self, years: List[int], period_ends: Dict[int, Tuple[int, int]] = None,
+                                   workers: int = None) -> Dict[int, Dict[str, PeriodReport]]:
+        """Generate all reports for several years, sharded by year across processes
+        
+        The master table is loaded once here; each worker only receives the
+        one-year slice of the month cube it needs. period_ends maps a year to
+        its (current_month, current_quarter) and defaults to the full year.
+        Results are returned in the order of years.
+        """
+        period_ends = period_ends or {}
+        tasks = [
+            (self.cube.for_year(year), year) + tuple(period_ends.get(year, (12, 4)))
+            for year in years
+        ]
+        
+        if workers == 1 or len(tasks) <= 1:
+            results = [_generate_year_reports(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map keeps results in submission order regardless of completion order
+                results = list(executor.map(_generate_year_reports, tasks))
+        
+        return OrderedDict(zip(years, results))
+
+
+def _generate_year_reports(task: Tuple[MonthCube, int, int, int]) -> Dict[str, PeriodReport]:
+    """Process-pool worker: all reports for one year from a one-year cube slice"""
+    cube, year, current_month, current_quarter = task
+    etl = ProceedETLService(autoload=False)
+    etl.use_cube(cube)
+    return etl.generate_all_reports(year, current_month, current_quarter)
+
+
+def parse_years(value: str) -> List[int]:
+    """Parse a year range or list such as "2021-2025" or "2023,2025" """
+    years = []
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = (int(bound) for bound in part.split('-', 1))
+            years.extend(range(first, last + 1))
+        elif part:
+            years.append(int(part))
+    return sorted(set(years))
+
+
+def compare_report_engines(reference: ProceedETLService, candidate: ProceedETLService,
+                           years: List[int]) -> List[str]:
+    """Check that two services produce the same report for every period of the given years
+
+    Used to keep the SQL pushdown engine equivalent to the month cube.
+    Besides the MTD/QTD/YTD reports, the trailing windows ending in June
+    (spanning the year boundary) and December are compared.
+    Returns a description of each report that differs, empty when all match.
+    """
+    mismatches = []
+    
+    def compare(report_name: str, period_type: str, year: int, **period):
+        expected = reference.build_report(period_type, year, **period).frame
+        actual = candidate.build_report(period_type, year, **period).frame
+        try:
+            pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                          check_dtype=False)
+        except AssertionError as e:
+            mismatches.append(f"{report_name}: {str(e).splitlines()[0]}")
+    
+    for year in years:
+        for report_name, period_type, month, quarter in reference.report_periods(year, 12, 4):
+            compare(report_name, period_type, year, month=month, quarter=quarter)
+        for month in (6, 12):
+            for report_name, months in reference.trailing_periods(year, month):
+                compare(report_name, 'trailing', year, month=month, months=months)
+    return mismatches
+
+
+class LiveService:
+    """Holds the current ProceedETLService and swaps in freshly loaded ones
+
+    reload() builds a complete new service (frame, cube, caches) off to the
+    side and then replaces the reference in one assignment. Readers take
+    live.etl once per request, so they see either the old or the new model,
+    never a partial one, and never wait for a reload.
+    """
+
+    # Reload durations kept for trend reporting
+    HISTORY_SIZE = 100
+
+    def __init__(self, etl: ProceedETLService):
+        self.etl = etl
+        self.reload_durations = []
+        self._reload_lock = threading.Lock()
+
+    def reload(self) -> Dict[str, Any]:
+        """Re-read the master table into a fresh service and swap it in"""
+        with self._reload_lock:
+            current = self.etl
+            started = time.perf_counter()
+            fresh = current.reloaded()
+            self.etl = fresh
+            duration = time.perf_counter() - started
+
+            self.reload_durations = (self.reload_durations + [duration])[-self.HISTORY_SIZE:]
+            average = sum(self.reload_durations) / len(self.reload_durations)
+            print(f"Reloaded {fresh.load_stats['records']} records in {duration * 1000:.1f} ms "
+                  f"(average {average * 1000:.1f} ms over last {len(self.reload_durations)} reloads)")
+            return dict(fresh.load_stats, reload_seconds=round(duration, 4))
+
+
+class MasterTableWatcher(threading.Thread):
+    """Background thread that hot-reloads a LiveService when its workbook changes
+
+    A change counts as complete once the file's size and mtime have stayed
+    the same for settle_seconds, and it is only reloaded when the content
+    hash differs from the loaded one. A reload that fails (for example on a
+    file that is still being written) keeps the current model and is
+    retried after the next settle period.
+    """
+
+    def __init__(self, live: LiveService, poll_interval: float = 1.0, settle_seconds: float = 2.0,
+                 on_reload=None):
+        super().__init__(name='master-table-watcher', daemon=True)
+        self.live = live
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.on_reload = on_reload
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            status = os.stat(self.live.etl.excel_file)
+        except OSError:
+            # Missing while a writer replaces it
+            return None
+        return status.st_size, status.st_mtime_ns
+
+    def run(self):
+        loaded = self.live.etl.source_fingerprint or {}
+        loaded_hash = loaded.get('sha256')
+        # Start from the state that was loaded so edits made during the load are seen
+        last_stat = (loaded.get('size'), loaded.get('mtime_ns'))
+        changed_at = None
 
+        while not self._stop_event.wait(self.poll_interval):
+            status = self._stat()
+            if status != last_stat:
+                last_stat = status
+                changed_at = time.monotonic()
+                continue
+            if status is None or changed_at is None or time.monotonic() - changed_at < self.settle_seconds:
+                continue
+
+            changed_at = None
+            try:
+                if file_fingerprint(self.live.etl.excel_file)['sha256'] == loaded_hash:
+                    continue
+                self.live.reload()
+            except Exception as e:
+                print(f"Reload failed, keeping previous data: {e}")
+                changed_at = time.monotonic()
+                continue
+
+            loaded_hash = self.live.etl.source_fingerprint['sha256']
+            if self.on_reload is not None:
+                self.on_reload(self.live.etl)
+
+
+class ReportServer(ThreadingHTTPServer):
+    """Local HTTP server answering report and slide queries from a warm ProceedETLService
+
+    The service lives in a LiveService, so reloads (POST /reload or the file
+    watcher) swap in a complete new model while requests keep using the
+    instance they started with.
+    """
+
+    daemon_threads = True
+    # Dashboard bursts exceed the default listen backlog of 5
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], live: LiveService):
+        super().__init__(address, ReportRequestHandler)
+        self.live = live
+
+    @property
+    def etl(self) -> ProceedETLService:
+        return self.live.etl
+
+    def reload(self) -> Dict[str, Any]:
+        return self.live.reload()
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: /report, /slides/<1-5>, /health and POST /reload"""
+
+    SLIDES = {
+        1: lambda etl, year, month, quarter: etl.generate_slide1_landing_achievement(year),
+        2: lambda etl, year, month, quarter: etl.generate_slide2_business_unit_landing(year),
+        3: lambda etl, year, month, quarter: etl.generate_slide3_business_unit_period_breakdown(year, month, quarter),
+        4: lambda etl, year, month, quarter: etl.generate_slide4_customer_achievement(year, quarter),
+        5: lambda etl, year, month, quarter: etl.generate_slide5_customer_by_service_type(year, quarter)
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        etl = self.server.etl
+        try:
+            if url.path == '/health':
+                self._send_json(200, {
+                    'excel_file': etl.excel_file,
+                    'load_stats': etl.load_stats,
+                    'report_cache': etl.report_cache_info(),
+                    'reload_seconds': [round(duration, 4) for duration in self.server.live.reload_durations]
+                })
+            elif url.path == '/report':
+                period_type, year, month, quarter = self._period_params(params)
+                if period_type not in ('month', 'quarter', 'year', 'trailing'):
+                    raise ValueError("period must be one of month, quarter, year, trailing")
+                months = int(params.get('months', 12)) if period_type == 'trailing' else None
+                self._send_json(200, etl.generate_report(period_type, year, month=month, quarter=quarter,
+                                                         months=months))
+            elif url.path == '/group':
+                if 'customer' not in params or 'service_type' not in params:
+                    raise ValueError("customer and service_type are required")
+                _, year, month, quarter = self._period_params(params)
+                self._send_json(200, etl.group_metrics(params['customer'], params['service_type'], year,
+                                                       month, quarter))
+            elif url.path == '/compare':
+                period_type, year, month, quarter = self._period_params(params)
+                if period_type not in ('month', 'quarter', 'year', 'trailing'):
+                    raise ValueError("period must be one of month, quarter, year, trailing")
+                months = int(params.get('months', 12)) if period_type == 'trailing' else None
+                comparison = etl.compare_periods(period_type, year, month=month, quarter=quarter, months=months,
+                                                 basis=params.get('basis', 'previous'))
+                self._send_json(200, comparison.to_records())
+            elif url.path.startswith('/slides/'):
+                slide_number = int(url.path[len('/slides/'):])
+                if slide_number not in self.SLIDES:
+                    raise ValueError("slide number must be 1-5")
+                _, year, month, quarter = self._period_params(params)
+                self._send_json(200, self.SLIDES[slide_number](etl, year, month, quarter))
+            else:
+                self._send_json(404, {'error': f"Unknown endpoint {url.path}"})
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            # Engine failures (e.g. a locked or missing SQLite table) still get a response
+            self._send_json(500, {'error': str(e)})
+
+    def do_POST(self):
+        if urlparse(self.path).path == '/reload':
+            try:
+                self._send_json(200, {'reloaded': True, 'load_stats': self.server.reload()})
+            except Exception as e:
+                self._send_json(500, {'reloaded': False, 'error': str(e)})
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint {self.path}"})
+
+    def _period_params(self, params: Dict[str, str]) -> Tuple[str, int, int, int]:
+        """period, year, month and quarter from query parameters, defaulting to today"""
+        today = datetime.now()
+        month = int(params.get('month', today.month))
+        quarter = int(params.get('quarter', (month - 1) // 3 + 1))
+        if not 1 <= month <= 12 or not 1 <= quarter <= 4:
+            raise ValueError("month must be 1-12 and quarter 1-4")
+        return params.get('period', 'year').lower(), int(params.get('year', today.year)), month, quarter
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        # Keep per-request logging off the hot path; errors still reach stderr
+        pass
+
+
+def serve(etl: ProceedETLService, host: str = '127.0.0.1', port: int = 8765, watch: bool = False,
+          settle_seconds: float = 2.0):
+    """Serve report and slide queries over HTTP until interrupted"""
+    # Keep the data warm before the first request arrives
+    etl.ensure_loaded()
+    live = LiveService(etl)
+    server = ReportServer((host, port), live)
+    if watch:
+        MasterTableWatcher(live, settle_seconds=settle_seconds).start()
+        print(f"Watching {etl.excel_file} for changes")
+    print(f"Serving Proceed reports on http://{host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def watch(etl: ProceedETLService, on_reload, settle_seconds: float = 2.0):
+    """Call on_reload with each hot-reloaded service until interrupted"""
+    etl.ensure_loaded()
+    watcher = MasterTableWatcher(LiveService(etl), settle_seconds=settle_seconds, on_reload=on_reload)
+    watcher.start()
+    print(f"Watching {etl.excel_file} for changes (Ctrl+C to stop)")
+    try:
+        while watcher.is_alive():
+            watcher.join(timeout=1.0)
+    except KeyboardInterrupt:
+        watcher.stop()
 
 def main():
     parser = argparse.ArgumentParser(description='Proceed Revenue ETL Service')
@@ -541,54 +2964,353 @@ def main():
     parser.add_argument('--period', choices=['month', 'quarter', 'year'], help='Specific period type')
     parser.add_argument('--export', action='store_true', help='Export reports to JSON files')
     parser.add_argument('--slides', action='store_true', help='Generate presentation slides')
+    parser.add_argument('--no-cache', action='store_true', help='Always parse the Excel file, ignoring the load cache')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Parse the Excel file and rewrite the load cache')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read only the numbers of each row into the month cube instead of loading the sheet')
+    parser.add_argument('--years', help='Batch mode: generate all reports for a year range or list, e.g. 2021-2025')
+    parser.add_argument('--workers', type=int, help='Worker processes for --years (default: CPU count)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only rebuild reports and slides affected by changes since the last incremental run')
+    parser.add_argument('--state-file', default=ETL_STATE_FILE, help='Fingerprint file used by --incremental')
+    parser.add_argument('--compact', action='store_true', help='Write exported JSON without indentation')
+    parser.add_argument('--gzip', action='store_true', help='Gzip exported JSON files (adds .gz)')
+    parser.add_argument('--bundle', metavar='FILE',
+                        help='Export all reports (or slides) of the run to this one indexed JSON file; implies --export')
+    
+    parser.add_argument('--sqlite', metavar='DATABASE', help='Also upsert the master rows into this SQLite database')
+    parser.add_argument('--sqlite-table', default=REVENUE_TABLE,
+                        help='Revenue table for --sqlite, --engine sqlite and --check-engines')
+    parser.add_argument('--sqlite-prune', action='store_true',
+                        help='With --sqlite, delete rows of the loaded years that are no longer in the workbook')
+    parser.add_argument('--materialize', action='store_true',
+                        help='With --sqlite, refresh the MTD/QTD/YTD summary tables for changed periods')
+    parser.add_argument('--engine', choices=['cube', 'sqlite'], default='cube',
+                        help='Aggregate in memory (cube) or push queries down to --database (sqlite)')
+    parser.add_argument('--database', help='SQLite database holding the revenue table for --engine sqlite')
+    parser.add_argument('--check-engines', action='store_true',
+                        help='Compare every report of --year (or --years) between the cube and --database, then exit')
+    parser.add_argument('--rollup', metavar='DIMENSIONS',
+                        help='Subtotals of --period (default year) over comma separated columns, e.g. Service_Type,Customer')
+    parser.add_argument('--grouping', choices=['rollup', 'cube'], default='rollup',
+                        help='Subtotal levels for --rollup: column prefixes (rollup) or all subsets (cube)')
+    parser.add_argument('--compare', choices=COMPARISON_BASES,
+                        help='Compare --period with the previous period (MoM/QoQ) or the same period last year (YoY)')
+    parser.add_argument('--customer', help='Print the MTD/QTD/YTD metrics of one customer (needs --service-type)')
+    parser.add_argument('--service-type', help='Service type of --customer, e.g. Transportation')
+    parser.add_argument('--pivot', action='store_true',
+                        help='Export one compact customer x month/quarter/YTD matrix per metric (pivot_<year>.json)')
+    parser.add_argument('--trailing', metavar='WINDOWS', nargs='?', const=','.join(map(str, TRAILING_WINDOWS)),
+                        help='Trailing-window reports ending at the current month, as comma separated month counts '
+                             '(default: 3,6,12)')
+    parser.add_argument('--forecast', action='store_true',
+                        help='Add run-rate and trend full-year projections as of the current month to the YTD '
+                             'report and the landing slides')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall time, CPU time, peak memory and row counts for every stage of the run')
+    parser.add_argument('--profile-json', metavar='FILE', help='Also write the stage profile as JSON; implies --profile')
+    parser.add_argument('--cprofile', metavar='STAGE',
+                        help='Run stages matching this pattern (e.g. "Slide 4*") under cProfile; implies --profile')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    serve_parser = subparsers.add_parser('serve', help='Keep the master data in memory and answer report queries over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: localhost only)')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    serve_parser.add_argument('--watch', action='store_true', help='Hot-reload when the workbook changes')
+    serve_parser.add_argument('--settle', type=float, default=2.0,
+                              help='Seconds the workbook must stay unchanged before it is reloaded')
+    watch_parser = subparsers.add_parser(
+        'watch', help='Regenerate reports (or --slides) whenever the workbook changes; implies --export')
+    watch_parser.add_argument('--settle', type=float, default=2.0,
+                              help='Seconds the workbook must stay unchanged before it is reloaded')
     
     args = parser.parse_args()
     
+    if args.profile_json or args.cprofile:
+        args.profile = True
+    if args.profile and args.command:
+        parser.error(f"--profile times a single run and cannot be combined with {args.command}")
+    profiler = StageProfiler(cprofile_stage=args.cprofile) if args.profile else None
+    
+    try:
+        run(args, parser, profiler)
+    finally:
+        if profiler is not None:
+            profiler.close()
+            profiler.print_table()
+            if args.profile_json:
+                with open(args.profile_json, 'w') as f:
+                    json.dump(profiler.to_dict(), f, indent=2)
+                print(f"Profile written to {args.profile_json}")
+
+
+def run(args: argparse.Namespace, parser: argparse.ArgumentParser, profiler: StageProfiler = None):
+    """Carry out one CLI invocation; stages are recorded on profiler when given"""
+    if (args.engine == 'sqlite' or args.check_engines) and not args.database:
+        parser.error('--engine sqlite and --check-engines require --database')
+    if args.engine == 'sqlite':
+        # The pushdown engine only answers period queries, it has no master frame
+        unsupported = [flag for flag, used in [('--years', args.years), ('--incremental', args.incremental),
+                                               ('--sqlite', args.sqlite), ('--rollup', args.rollup),
+                                               ('--pivot', args.pivot), ('--forecast', args.forecast),
+                                               ('watch', args.command == 'watch')] if used]
+        if unsupported:
+            parser.error(f"--engine sqlite cannot be combined with {', '.join(unsupported)}")
+    
+    if args.sqlite_prune and not args.sqlite:
+        parser.error('--sqlite-prune requires --sqlite')
+    if args.materialize and not args.sqlite:
+        parser.error('--materialize requires --sqlite')
+    if args.stream and (args.rollup or args.engine == 'sqlite'):
+        parser.error('--stream only builds the month cube and cannot be combined with --rollup or --engine sqlite')
+    if bool(args.customer) != bool(args.service_type):
+        parser.error('--customer and --service-type must be given together')
+    if args.customer and (args.stream or args.engine == 'sqlite'):
+        parser.error('--customer needs the master rows, which --stream and --engine sqlite do not load')
+    if args.compare and not args.period:
+        parser.error('--compare needs --period month, quarter or year')
+    trailing_windows = []
+    if args.trailing:
+        try:
+            trailing_windows = [int(window) for window in args.trailing.split(',') if window.strip()]
+        except ValueError:
+            trailing_windows = []
+        if not trailing_windows or min(trailing_windows) < 1:
+            parser.error('--trailing expects positive month counts such as 3,6,12')
+    if args.incremental and args.years:
+        parser.error('--incremental tracks the changes of a single --year and cannot be combined with --years')
+    if args.forecast and (args.years or args.incremental):
+        parser.error('--forecast projects a single year and cannot be combined with --years or --incremental')
+    if args.bundle and args.incremental:
+        parser.error('--bundle always holds every report of the run and cannot be combined with --incremental')
+    # Per-report output suffix, also used to find existing outputs for --incremental
+    suffix = '.json' + (GZIP_SUFFIX if args.gzip else '')
+    
+    def export_reports(target: ProceedETLService, reports: Dict[str, Any], skip_unchanged: bool = False):
+        if args.bundle:
+            target.export_reports_bundle(reports, args.bundle, skip_unchanged, compress=args.gzip)
+            return
+        for report_name, report_data in reports.items():
+            target.export_report_to_json(report_data, f"{report_name}.json", skip_unchanged,
+                                         compact=args.compact, compress=args.gzip)
+    
+    if args.check_engines:
+        years = parse_years(args.years) if args.years else [args.year]
+        cube_etl = ProceedETLService(use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache, profiler=profiler,
+                                     years=years, streaming=args.stream)
+        cube_etl.ensure_loaded()
+        sqlite_etl = ProceedETLService(autoload=False, profiler=profiler)
+        sqlite_etl.use_engine(SQLiteReportEngine(args.database, args.sqlite_table))
+        mismatches = compare_report_engines(cube_etl, sqlite_etl, years)
+        for mismatch in mismatches:
+            print(f"Mismatch in {mismatch}")
+        print(f"Engine check for {', '.join(map(str, years))}: "
+              f"{'all reports match' if not mismatches else f'{len(mismatches)} reports differ'}")
+        if mismatches:
+            raise SystemExit(1)
+        return
+    
     # Initialize ETL service
-    etl = ProceedETLService()
+    if args.engine == 'sqlite':
+        etl = ProceedETLService(autoload=False, profiler=profiler)
+        etl.use_engine(SQLiteReportEngine(args.database, args.sqlite_table))
+        print(f"Reporting from {args.database}:{args.sqlite_table} (SQL pushdown)")
+    else:
+        # Long-running modes and the SQLite export need every year; one-shot reports only their own
+        if args.command or args.sqlite:
+            load_years = None
+        elif args.compare:
+            # The compared period lies at most one year back
+            load_years = [args.year - 1, args.year]
+        elif trailing_windows:
+            # The longest window ending in January reaches furthest back
+            first_month, _ = trailing_month_range(args.year, 1, max(trailing_windows))
+            load_years = list(range(first_month // 12, args.year + 1))
+        else:
+            # Single-year modes report --year even when --years is given
+            load_years = sorted(set(parse_years(args.years)) | {args.year}) if args.years else [args.year]
+        # Rollup dimensions may name sheet columns beyond the ones reports use
+        extra_columns = [dimension.strip() for dimension in (args.rollup or '').split(',') if dimension.strip()]
+        etl = ProceedETLService(use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache, profiler=profiler,
+                                years=load_years, extra_columns=extra_columns, streaming=args.stream)
+        # Load up front so the load stages are profiled on their own, not inside the first report or slide
+        etl.ensure_loaded()
+    
+    if args.sqlite:
+        etl.export_to_sqlite(args.sqlite, args.sqlite_table, prune=args.sqlite_prune)
+        if args.materialize:
+            with etl.stage(f"materialize {args.sqlite}"):
+                etl.materialize_aggregates(args.sqlite)
+    
+    if args.command == 'serve':
+        serve(etl, args.host, args.port, watch=args.watch, settle_seconds=args.settle)
+        return
     
     # Determine current period based on current date
     current_date = datetime.now()
     current_month = args.month or current_date.month
     current_quarter = args.quarter or ((current_date.month - 1) // 3 + 1)
     
+    if args.command == 'watch':
+        def regenerate(reloaded: ProceedETLService):
+            if args.slides:
+                reloaded.generate_presentation_slides(args.year, current_month, current_quarter, skip_unchanged=True,
+                                                      compact=args.compact, compress=args.gzip, bundle=args.bundle,
+                                                      forecast=args.forecast)
+            else:
+                export_reports(reloaded, reloaded.generate_all_reports(args.year, current_month, current_quarter,
+                                                                       forecast=args.forecast),
+                               skip_unchanged=True)
+        
+        # Bring the outputs up to date before waiting for changes
+        regenerate(etl)
+        watch(etl, regenerate, settle_seconds=args.settle)
+        return
+    
+    # Incremental runs diff the new load against the fingerprints of the last one
+    state_scope = (f"slides:{args.year}:{current_month}:{current_quarter}" if args.slides
+                   else f"reports:{args.year}")
+    changed_months = None
+    if args.incremental:
+        changed_months = etl.changed_months(args.year, load_etl_state(args.state_file, state_scope))
+        changed = sorted(changed_months) if changed_months is not None else 'all (no previous state)'
+        print(f"Incremental run, changed months in {args.year}: {changed}")
+    # Set by the modes that bring the outputs tracked by state_scope up to date
+    outputs_current = False
+    
     if args.slides:
         # Generate presentation slides
-        etl.generate_presentation_slides(args.year, current_month, current_quarter)
+        slide_files = [f"{name}{suffix}" for name in [
+            "Slide1_Landing_Achievement", "Slide2_Business_Unit_Landing", "Slide3_Business_Unit_Period_Breakdown",
+            "Slide4_Customer_Achievement", "Slide5_Customer_By_Service_Type"]]
+        if (args.incremental and changed_months is not None and not changed_months and
+                all(os.path.exists(filename) for filename in slide_files)):
+            print(f"\nNo changes for {args.year}, presentation slides left untouched")
+        else:
+            etl.generate_presentation_slides(args.year, current_month, current_quarter,
+                                             skip_unchanged=args.incremental, compact=args.compact,
+                                             compress=args.gzip, bundle=args.bundle, forecast=args.forecast)
+        outputs_current = True
+    
+    elif args.rollup:
+        # Subtotals over arbitrary sheet columns for one period
+        dimensions = [dimension.strip() for dimension in args.rollup.split(',') if dimension.strip()]
+        grouping_sets = (cube_grouping_sets(dimensions) if args.grouping == 'cube'
+                         else rollup_grouping_sets(dimensions))
+        period_type = args.period or 'year'
+        rollup = etl.rollup(dimensions, grouping_sets, period_type, args.year,
+                            month=current_month, quarter=current_quarter)
+        period_name = etl.get_period_name(period_type, args.year, current_month, current_quarter)
+        print(f"\n=== {period_name} {args.grouping} over {', '.join(dimensions)} ===")
+        print(rollup.to_string(index=False))
+        
+        if args.export:
+            filename = f"rollup_{period_type}_{args.year}.json"
+            etl.export_report_to_json(rollup.to_dict('records'), filename, compact=args.compact, compress=args.gzip)
+    
+    elif args.customer:
+        # Drill-down into one group, answered from the sorted group index
+        metrics = etl.group_metrics(args.customer, args.service_type, args.year, current_month, current_quarter)
+        print(f"\n=== {args.customer} / {args.service_type} {args.year} ===")
+        print(json.dumps(metrics, indent=2))
+    
+    elif args.pivot:
+        # Every month, quarter and YTD column of the year in one wide file instead of one file per report
+        pivot = etl.build_pivot(args.year, current_month, current_quarter)
+        print(f"\n=== {args.year} pivot: {len(pivot['rows'])} groups x {', '.join(pivot['columns'])} ===")
+        etl.export_pivot(pivot, f"pivot_{args.year}.json", compress=args.gzip)
+    
+    elif args.compare:
+        # Current period against the previous one or the same period last year, with changes per group
+        comparison = etl.compare_periods(args.period, args.year, month=current_month, quarter=current_quarter,
+                                         basis=args.compare)
+        statuses = comparison.frame['status'].value_counts()
+        print(f"\n=== {comparison.period_name} vs {comparison.previous_name} ===")
+        print(f"Records: {len(comparison)} ({statuses.get('new', 0)} new, {statuses.get('lost', 0)} lost)")
+        sys.stdout.writelines(iter_json(comparison))
+        sys.stdout.write('\n')
+        
+        if args.export:
+            filename = f"{args.period}_comparison_{args.compare}_{args.year}.json"
+            etl.export_report_to_json(comparison, filename, compact=args.compact, compress=args.gzip)
+    
+    elif trailing_windows:
+        # Rolling windows ending at the current month, crossing into earlier years as needed
+        trailing_reports = etl.generate_trailing_reports(args.year, current_month, trailing_windows)
+        for report_name, report_data in trailing_reports.items():
+            print(f"\n=== {report_data.period_name} Trailing Report ===")
+            print(f"Records: {len(report_data)}")
+        
+        if args.export or args.bundle:
+            export_reports(etl, trailing_reports)
     
     elif args.period:
         # Generate specific period report
         if args.period == 'month':
-            report = etl.generate_report('month', args.year, month=current_month)
+            report = etl.build_report('month', args.year, month=current_month)
             period_name = etl.get_period_name('month', args.year, current_month)
             print(f"\n=== {period_name} MTD Report ===")
         elif args.period == 'quarter':
-            report = etl.generate_report('quarter', args.year, quarter=current_quarter)
+            report = etl.build_report('quarter', args.year, quarter=current_quarter)
             period_name = etl.get_period_name('quarter', args.year, quarter=current_quarter)
             print(f"\n=== {period_name} QTD Report ===")
         elif args.period == 'year':
-            report = etl.generate_report('year', args.year)
+            report = (etl.build_forecast_report(args.year, current_month) if args.forecast
+                      else etl.build_report('year', args.year))
             period_name = etl.get_period_name('year', args.year)
             print(f"\n=== {period_name} YTD Report ===")
         
-        print(json.dumps(report, indent=2))
+        # Stream the rows instead of building the whole document first
+        sys.stdout.writelines(iter_json(report))
+        sys.stdout.write('\n')
         
         if args.export:
             filename = f"{args.period}_report_{args.year}.json"
-            etl.export_report_to_json(report, filename)
+            etl.export_report_to_json(report, filename, compact=args.compact, compress=args.gzip)
+    
+    elif args.years:
+        # Batch mode: one worker per year, full years except the current one
+        years = parse_years(args.years)
+        period_ends = {
+            year: (current_month, current_quarter) if year == current_date.year or args.month or args.quarter else (12, 4)
+            for year in years
+        }
+        print(f"\nGenerating all reports for {', '.join(map(str, years))}...")
+        batch_reports = etl.generate_all_reports_batch(years, period_ends, args.workers)
+        
+        for year, all_reports in batch_reports.items():
+            for report_name, report_data in all_reports.items():
+                print(f"\n=== {report_name} ===")
+                print(f"Records: {len(report_data)}")
+        
+        if args.export or args.bundle:
+            export_reports(etl, OrderedDict(
+                (report_name, report_data)
+                for all_reports in batch_reports.values() for report_name, report_data in all_reports.items()
+            ))
     
     else:
         # Generate all reports
         print(f"\nGenerating all reports for {args.year}...")
-        all_reports = etl.generate_all_reports(args.year, current_month, current_quarter)
+        if args.incremental:
+            all_reports = etl.generate_changed_reports(args.year, changed_months, current_month, current_quarter,
+                                                       suffix=suffix)
+            print(f"Reports affected by changes: {len(all_reports)}")
+        else:
+            all_reports = etl.generate_all_reports(args.year, current_month, current_quarter,
+                                                   forecast=args.forecast)
         
         for report_name, report_data in all_reports.items():
             print(f"\n=== {report_name} ===")
             print(f"Records: {len(report_data)}")
-            
-            if args.export:
-                filename = f"{report_name}.json"
-                etl.export_report_to_json(report_data, filename)
+        
+        if args.export or args.bundle:
+            export_reports(etl, all_reports, skip_unchanged=args.incremental)
+            outputs_current = True
+    
+    if args.incremental and outputs_current:
+        # Only remember the load once its outputs have been written
+        save_etl_state(args.state_file, state_scope, etl.cube.group_fingerprints(args.year))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the Proceed Revenue ETL tests
+
+Run from the directory holding proceed_etl_service.py:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# proceed_etl_service.py is a script next to this directory, not an installed module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proceed_etl_service import METRIC_COLUMNS, ProceedETLService
+from benchmarks.synthetic import generate_master_table
+
+
+@pytest.fixture
+def master_frame():
+    """Three synthetic years with sub-cent amounts, so rounding ties occur"""
+    frame = generate_master_table(rows=3000, customers=25, years=(2023, 2024, 2025), seed=1)
+    rng = np.random.default_rng(1)
+    for column in METRIC_COLUMNS:
+        frame[column] = np.round(frame[column] + rng.integers(0, 1000, len(frame)) / 1000, 3)
+    return frame
+
+
+@pytest.fixture
+def etl(master_frame):
+    service = ProceedETLService(autoload=False)
+    service.load_frame(master_frame)
+    return service
@@ -0,0 +1,31 @@
+"""
+Permissions of files written through a temporary file and a rename
+"""
+
+import os
+import stat
+
+from proceed_etl_service import file_fingerprint, save_etl_state, write_frame_cache
+
+
+def file_mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_frame_cache_is_not_private(master_frame, tmp_path):
+    source = tmp_path / 'Master_Table.xlsx'
+    source.write_bytes(b'workbook')
+    cache_file = str(tmp_path / 'Master_Table.xlsx.cache.npz')
+    assert write_frame_cache(cache_file, master_frame, file_fingerprint(str(source)))
+    assert file_mode(cache_file) == 0o644
+
+    # A rewrite keeps the mode the file was given
+    os.chmod(cache_file, 0o664)
+    assert write_frame_cache(cache_file, master_frame, file_fingerprint(str(source)))
+    assert file_mode(cache_file) == 0o664
+
+
+def test_etl_state_is_not_private(tmp_path):
+    state_file = str(tmp_path / '.etl_state.json')
+    save_etl_state(state_file, 'reports:2025', {('Customer 00001', 'Transportation', 2025): ['0' * 16] * 12})
+    assert file_mode(state_file) == 0o644
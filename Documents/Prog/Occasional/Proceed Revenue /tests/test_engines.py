@@ -0,0 +1,138 @@
+"""
+Equivalence of the SQL pushdown engine and the month cube
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from proceed_etl_service import ProceedETLService, SQLiteReportEngine, compare_report_engines
+from benchmarks.synthetic import generate_master_table
+
+YEARS = [2024, 2025]
+
+
+@pytest.fixture
+def engine_frame():
+    """Synthetic table with revenue-less groups and duplicate rows"""
+    frame = generate_master_table(rows=2000, customers=15, years=YEARS, seed=3)
+    # Groups without any revenue keep their whole year in the smart YTD
+    no_revenue = frame['Customer'].isin(['Customer 00001', 'Customer 00002']) & (frame['Year'] == 2025)
+    frame.loc[no_revenue, 'Revenue'] = np.nan
+    # Repeated customer/service/month keys are summed by both engines
+    duplicates = frame.sample(n=150, random_state=3)
+    return pd.concat([frame, duplicates], ignore_index=True)
+
+
+def engines(frame: pd.DataFrame, database_file: str, prune: bool = False):
+    cube_etl = ProceedETLService(autoload=False)
+    cube_etl.load_frame(frame)
+    cube_etl.export_to_sqlite(database_file, prune=prune)
+    sqlite_etl = ProceedETLService(autoload=False)
+    sqlite_etl.use_engine(SQLiteReportEngine(database_file))
+    return cube_etl, sqlite_etl
+
+
+def test_engines_match(engine_frame, tmp_path):
+    cube_etl, sqlite_etl = engines(engine_frame, str(tmp_path / 'revenue.db'))
+    # Every MTD/QTD/YTD report plus trailing windows ending in June, which reach into the previous year
+    assert compare_report_engines(cube_etl, sqlite_etl, YEARS) == []
+
+
+def test_engines_match_without_revenue(engine_frame, tmp_path):
+    cube_etl, sqlite_etl = engines(engine_frame, str(tmp_path / 'revenue.db'))
+    ytd = sqlite_etl.build_report('year', 2025).frame
+    no_revenue = ytd[ytd['Customer'].isin(['Customer 00001', 'Customer 00002'])]
+    assert len(no_revenue) and (no_revenue['revenue'] == 0).all()
+    pd.testing.assert_frame_equal(cube_etl.build_report('year', 2025).frame.reset_index(drop=True),
+                                  ytd.reset_index(drop=True), check_dtype=False)
+
+
+def test_engines_match_after_rows_are_removed(engine_frame, tmp_path):
+    database_file = str(tmp_path / 'revenue.db')
+    engines(engine_frame, database_file)
+    # Re-exporting a smaller table with pruning must drop the rows that left it
+    cube_etl, sqlite_etl = engines(engine_frame[engine_frame['Customer'] != 'Customer 00003'], database_file,
+                                   prune=True)
+    assert compare_report_engines(cube_etl, sqlite_etl, YEARS) == []
+
+
+def count_rows(database_file: str, where: str) -> int:
+    connection = sqlite3.connect(database_file)
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM revenue_data WHERE {where}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_export_keeps_rows_outside_the_workbook(engine_frame, tmp_path):
+    database_file = str(tmp_path / 'revenue.db')
+    engines(engine_frame, database_file)
+    connection = sqlite3.connect(database_file)
+    with connection:
+        # A row uploaded through the dashboard for a year the workbook does not cover
+        connection.execute("INSERT INTO revenue_data (customer, service_type, year, month, revenue) "
+                           "VALUES ('Uploaded', 'Transportation', 2023, 'Jan', 10)")
+    connection.close()
+
+    smaller = engine_frame[engine_frame['Customer'] != 'Customer 00003']
+    engines(smaller, database_file)
+    # A plain export only upserts
+    assert count_rows(database_file, "customer = 'Customer 00003'") > 0
+    assert count_rows(database_file, "customer = 'Uploaded'") == 1
+
+    engines(smaller, database_file, prune=True)
+    # Pruning stays within the years just loaded
+    assert count_rows(database_file, "customer = 'Customer 00003'") == 0
+    assert count_rows(database_file, "customer = 'Uploaded'") == 1
+
+
+# revenue_data as backend/database/schema.sql creates it, then the columns its migrations add
+BACKEND_SCHEMA = """
+CREATE TABLE revenue_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer TEXT NOT NULL,
+    service_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    cost REAL DEFAULT 0,
+    target REAL DEFAULT 0,
+    revenue REAL DEFAULT 0,
+    receivables_collected REAL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(customer, service_type, year, month)
+);
+"""
+BACKEND_MIGRATIONS = """
+ALTER TABLE revenue_data ADD COLUMN days INTEGER DEFAULT 30;
+ALTER TABLE revenue_data ADD COLUMN original_cost REAL DEFAULT 0;
+ALTER TABLE revenue_data ADD COLUMN original_target REAL DEFAULT 0;
+"""
+
+
+@pytest.mark.parametrize('migrated', [True, False])
+def test_export_fills_backend_columns(engine_frame, tmp_path, migrated):
+    database_file = str(tmp_path / 'revenue.db')
+    connection = sqlite3.connect(database_file)
+    connection.executescript(BACKEND_SCHEMA + (BACKEND_MIGRATIONS if migrated else ''))
+    connection.close()
+
+    cube_etl, sqlite_etl = engines(engine_frame, database_file)
+    assert compare_report_engines(cube_etl, sqlite_etl, YEARS) == []
+    connection = sqlite3.connect(database_file)
+    try:
+        rows = connection.execute("SELECT year, month, cost, target, days, original_cost, original_target "
+                                  "FROM revenue_data").fetchall()
+        # The dashboard reports SUM(COALESCE(original_cost, cost, 0))
+        dashboard_cost = connection.execute(
+            "SELECT SUM(COALESCE(original_cost, cost, 0)) FROM revenue_data WHERE year = 2025").fetchone()[0]
+    finally:
+        connection.close()
+    assert rows
+    for year, month, cost, target, days, original_cost, original_target in rows:
+        assert (original_cost, original_target) == (cost, target)
+        assert days == pd.Period(f"{month} {year}", freq='M').days_in_month
+    assert dashboard_cost == pytest.approx(engine_frame.loc[engine_frame['Year'] == 2025, 'Cost'].sum())
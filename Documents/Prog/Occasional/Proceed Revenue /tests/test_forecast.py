@@ -0,0 +1,80 @@
+"""
+Run-rate and trend landing forecasts
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from proceed_etl_service import MONTH_NAMES, ProceedETLService
+
+
+@pytest.fixture
+def forecast_etl():
+    """Revenue rising by 10 a month that stops after June, a flat full year and a group without revenue"""
+    rows = []
+    for month_num, month in enumerate(MONTH_NAMES, start=1):
+        rows.append(('Rising', 'Transportation', 2025, month, 90 + 10 * month_num if month_num <= 6 else np.nan))
+        rows.append(('Flat', 'Warehouses', 2025, month, 50.0))
+        rows.append(('Idle', 'Transportation', 2025, month, np.nan))
+    frame = pd.DataFrame(rows, columns=['Customer', 'Service_Type', 'Year', 'Month', 'Revenue'])
+    frame['Cost'] = 20.0
+    frame['Target'] = 200.0
+    frame['Receivables Collected'] = np.nan
+    service = ProceedETLService(autoload=False)
+    service.load_frame(frame)
+    return service
+
+
+def forecast_row(etl: ProceedETLService, customer: str, as_of: int) -> pd.Series:
+    forecast = etl.forecast(2025, as_of)
+    return forecast.set_index('Customer').loc[customer]
+
+
+def test_months_after_the_last_revenue_are_projected(forecast_etl):
+    # October is not booked for Rising yet, so its actuals end in June
+    rising = forecast_row(forecast_etl, 'Rising', 10)
+    assert rising['revenue_to_date'] == 750
+    assert rising['run_rate_revenue'] == pytest.approx(750 + 125 * 6)
+    assert rising['trend_revenue'] == pytest.approx(750 + sum(90 + 10 * month for month in range(7, 13)))
+    assert rising['full_year_target'] == 2400
+
+
+def test_actuals_end_at_as_of(forecast_etl):
+    rising = forecast_row(forecast_etl, 'Rising', 4)
+    assert rising['revenue_to_date'] == 460
+    assert rising['run_rate_revenue'] == pytest.approx(460 + 115 * 8)
+    assert rising['trend_revenue'] == pytest.approx(460 + sum(90 + 10 * month for month in range(5, 13)))
+
+
+def test_full_year_and_revenue_less_groups(forecast_etl):
+    flat = forecast_row(forecast_etl, 'Flat', 12)
+    assert flat['run_rate_revenue'] == flat['trend_revenue'] == 600
+    idle = forecast_row(forecast_etl, 'Idle', 9)
+    assert idle['run_rate_revenue'] == idle['trend_revenue'] == 0
+
+
+def test_forecast_report_achievement(forecast_etl):
+    frame = forecast_etl.build_forecast_report(2025, 10).frame.set_index('Customer')
+    assert frame.loc['Rising', 'run_rate_achievement_pct'] == 62.5
+    assert frame.loc['Rising', 'trend_achievement_pct'] == 77.5
+    assert frame.loc['Idle', 'run_rate_achievement_pct'] == 0
+
+
+@pytest.mark.parametrize('as_of', [1, 2, 7, 11])
+def test_batched_fit_matches_per_group_fit(etl, as_of):
+    cube = etl.cube
+    position = cube._year_position(2024)
+    forecast = etl.forecast(2024, as_of)
+    for row in forecast.itertuples():
+        customer = list(cube.customers).index(row.Customer)
+        service_type = list(cube.service_types).index(row.Service_Type)
+        actual_months = min(as_of, cube.last_revenue_month[position, customer, service_type])
+        actuals = cube.monthly[position, customer, service_type, :actual_months, 2]
+        run_rate = actuals.sum() + (actuals.mean() * (12 - actual_months) if actual_months else 0)
+        trend = run_rate
+        if 2 <= actual_months < 12:
+            slope, intercept = np.polyfit(np.arange(1, actual_months + 1), actuals, 1)
+            trend = actuals.sum() + np.clip(intercept + slope * np.arange(actual_months + 1, 13), 0, None).sum()
+        assert row.run_rate_revenue == pytest.approx(run_rate)
+        assert row.trend_revenue == pytest.approx(trend, rel=1e-9, abs=1e-6)
@@ -0,0 +1,78 @@
+"""
+Month cube totals against a row-by-row aggregation of the master table
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from proceed_etl_service import METRIC_COLUMNS, MONTH_INDEX, grouped_sums, period_month_range
+
+PERIODS = [('month', 2024, 7, None), ('quarter', 2023, None, 2), ('quarter', 2025, None, 4), ('year', 2024, None, None)]
+
+
+def row_totals(frame: pd.DataFrame, period_type: str, year: int, month: int = None, quarter: int = None) -> pd.DataFrame:
+    """Group totals summed straight from the rows, smart YTD cut off at each group's last revenue month
+
+    Each group's rows are summed on their own, in load order, as the
+    original report filtered a group and summed its columns.
+    """
+    rows = frame[frame['Year'] == year].fillna({column: 0 for column in METRIC_COLUMNS})
+    month_num = rows['Month'].map(MONTH_INDEX) + 1
+    if period_type == 'year':
+        last_revenue = month_num.where(rows['Revenue'] > 0).groupby(
+            [rows['Customer'], rows['Service_Type']]).transform('max').fillna(12)
+        selected = rows[month_num <= last_revenue]
+    else:
+        first_month, last_month = period_month_range(period_type, month, quarter)
+        selected = rows[month_num.between(first_month, last_month)]
+    return selected.groupby(['Customer', 'Service_Type'])[METRIC_COLUMNS].agg(
+        lambda column: column.to_numpy().sum()).reset_index()
+
+
+@pytest.mark.parametrize('period_type, year, month, quarter', PERIODS)
+def test_cube_totals_match_row_sums(etl, master_frame, period_type, year, month, quarter):
+    expected = row_totals(master_frame, period_type, year, month, quarter)
+    totals = etl.cube.period_totals(period_type, year, month, quarter)
+    merged = expected.merge(totals, on=['Customer', 'Service_Type'], suffixes=('', '_cube'), validate='1:1')
+    assert len(merged) == len(expected) == len(totals)
+    for column in METRIC_COLUMNS:
+        np.testing.assert_array_equal(merged[f"{column}_cube"], merged[column])
+
+
+@pytest.mark.parametrize('period_type, year, month, quarter', PERIODS)
+def test_report_amounts_match_rounded_row_sums(etl, master_frame, period_type, year, month, quarter):
+    expected = row_totals(master_frame, period_type, year, month, quarter)
+    frame = etl.build_report(period_type, year, month=month, quarter=quarter).frame
+    merged = expected.merge(frame, on=['Customer', 'Service_Type'], validate='1:1')
+    for column, report_column in zip(METRIC_COLUMNS, ['cost', 'target', 'revenue', 'receivables_collected']):
+        np.testing.assert_array_equal(merged[report_column], merged[column].round(2))
+
+
+def test_grouped_sums_match_numpy_sum():
+    rng = np.random.default_rng(2)
+    # Group sizes around numpy's 8-wide unrolling and 128-value blocks
+    sizes = np.array([0, 1, 7, 8, 9, 16, 127, 128, 129, 300, 1000, 5])
+    values = rng.random((sizes.sum(), 2)) * 1000
+    group_ids = np.repeat(np.arange(len(sizes)), sizes)
+    totals = grouped_sums(group_ids, values, len(sizes))
+    for group in range(len(sizes)):
+        # Column by column, as Series.sum adds a contiguous 1-D array
+        expected = [np.ascontiguousarray(values[group_ids == group][:, column]).sum() for column in range(2)]
+        assert totals[group].tolist() == expected
+
+
+def test_group_metrics_equal_reports(etl):
+    report = etl.build_report('year', 2024).frame
+    quarter = etl.build_report('quarter', 2024, quarter=3).frame.set_index(['Customer', 'Service_Type'])
+    for row in report.head(20).itertuples():
+        metrics = etl.group_metrics(row.Customer, row.Service_Type, 2024, month=9, quarter=3)
+        assert metrics['ytd']['revenue'] == row.revenue
+        assert metrics['ytd']['cost'] == row.cost
+        assert metrics['ytd']['achievement_pct'] == row.achievement_pct
+        if (row.Customer, row.Service_Type) in quarter.index:
+            expected = quarter.loc[(row.Customer, row.Service_Type)]
+            assert metrics['qtd']['target'] == expected['target']
+            assert metrics['qtd']['collection_rate_pct'] == expected['collection_rate_pct']
+        else:
+            assert metrics['qtd'] is None